@@ -1,16 +1,22 @@
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
 RAW_DIR   = r"01. Raw"
 TRANS_DIR = r"02. Raw - Translated"
 CONS_FILE = r"03. Consolidated/consolidated.xlsx"
 OUTPUT    = "column_check_summary.xlsx"
+# headers and counts of every workbook read, reused while its contents are unchanged
+CACHE     = ".column_check_cache.json"
 
 def column_info_by_position(df):
     """
     Return [(position, header_lowercase, non-null count)]
     """
-    return [(i, col.lower(), df[col].notna().sum()) for i, col in enumerate(df.columns)]
+    return [(i, col.lower(), int(df.iloc[:, i].notna().sum())) for i, col in enumerate(df.columns)]
 
 def safe_read(path):
     try:
@@ -22,69 +28,175 @@ def safe_read(path):
         print(f"Error reading {path}: {e}")
         return None
 
-# Read consolidated once
-cons_df = safe_read(CONS_FILE)
-if cons_df is None:
-    raise SystemExit("Cannot read consolidated file.")
-cons_first_col = cons_df.columns[0]  # first column = source filename
-
-rows = []
-
-for fname in os.listdir(RAW_DIR):
-    if not fname.lower().endswith((".xls", ".xlsx")):
-        continue
+def file_key(path):
+    """
+    [size, sha256 of the contents] of a file, None if it is missing.
+    Hashing reads every byte but is far cheaper than parsing the workbook,
+    and unlike mtime and size it catches any edit
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return [os.path.getsize(path), digest.hexdigest()]
 
-    fname_lower = fname.lower()
-    raw_path  = os.path.join(RAW_DIR, fname)
-    trans_path = os.path.join(
-        TRANS_DIR,
-        fname.replace(".xlsx", " - translated.xlsx")
-    )
+def read_columns(path):
+    """
+    Run in a worker: [(header, non-null count)] by position, None if unreadable
+    """
+    df = safe_read(path)
+    if df is None:
+        return None
+    return [(head, count) for _, head, count in column_info_by_position(df)]
 
-    raw_df  = safe_read(raw_path)
-    trans_df = safe_read(trans_path)
-    if raw_df is None or trans_df is None:
-        continue
+def read_consolidated(path):
+    """
+    Run in a worker: the consolidated headers and, per source filename
+    (lowercase, from the first column), the non-null count of every column
+    """
+    df = safe_read(path)
+    if df is None:
+        return None
+    counts = df.notna().groupby(df[df.columns[0]].str.lower()).sum()
+    return {
+        "columns": list(df.columns),
+        "counts": {fname: {col: int(n) for col, n in row.items()} for fname, row in counts.iterrows()},
+    }
 
-    # filter consolidated rows where first column (lowercase) equals filename (lowercase)
-    cons_sub = cons_df[cons_df[cons_first_col].str.lower() == fname_lower]
+def load_cache():
+    """
+    {path: {"key": file_key, "result": reader result}} from the last run,
+    empty if there is none or it cannot be read
+    """
+    try:
+        with open(CACHE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    for pos, raw_head, raw_count in column_info_by_position(raw_df):
+def save_cache(cache):
+    """
+    Write the cache through a temporary file, so an interrupted run
+    never leaves it half written
+    """
+    tmp = CACHE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, CACHE)
 
-        # translated: match by position
-        if pos < trans_df.shape[1]:
-            t_head = trans_df.columns[pos].lower()
-            t_count = trans_df.iloc[:, pos].notna().sum()
+def read_all(jobs, cache):
+    """
+    jobs is {path: reader}. Workbooks changed since they were cached are
+    parsed in a process pool, everything else comes from the cache.
+    Returns {path: result}, None for workbooks that could not be read
+    """
+    results = {}
+    pending = {}
+    hits = missing = 0
+    for path, reader in jobs.items():
+        key = file_key(path)
+        entry = cache.get(path)
+        if key is not None and entry is not None and entry["key"] == key:
+            results[path] = entry["result"]
+            hits += 1
+        elif key is None:
+            print(f"Error reading {path}: file not found")
+            results[path] = None
+            missing += 1
         else:
-            t_head = t_count = None
+            pending[path] = (reader, key)
 
-        # consolidated: use translated header + filename filter
-        if t_head and t_head in cons_sub.columns:
-            c_count = cons_sub[t_head].notna().sum()
-        else:
-            c_count = None
+    if pending:
+        with ProcessPoolExecutor() as pool:
+            futures = {path: pool.submit(reader, path) for path, (reader, _) in pending.items()}
+            for path, future in futures.items():
+                results[path] = future.result()
+                # failed reads are not cached, so they are retried next run
+                if results[path] is not None:
+                    cache[path] = {"key": pending[path][1], "result": results[path]}
+    print(f"{hits} workbooks from cache, {len(pending)} parsed, {missing} missing")
+    return results
 
-        diff_raw_trans = (
-            None if (raw_count is None or t_count is None)
-            else raw_count - t_count
-        )
-        diff_trans_cons = (
-            None if (t_count is None or c_count is None)
-            else t_count - c_count
+def main():
+    raw_files = [
+        fname for fname in os.listdir(RAW_DIR)
+        if fname.lower().endswith((".xls", ".xlsx"))
+    ]
+    jobs = {CONS_FILE: read_consolidated}
+    pairs = []
+    for fname in raw_files:
+        raw_path  = os.path.join(RAW_DIR, fname)
+        trans_path = os.path.join(
+            TRANS_DIR,
+            fname.replace(".xlsx", " - translated.xlsx")
         )
+        jobs[raw_path] = read_columns
+        jobs[trans_path] = read_columns
+        pairs.append((fname, raw_path, trans_path))
+
+    cache = load_cache()
+    results = read_all(jobs, cache)
+    save_cache(cache)
+
+    # Read consolidated once
+    cons = results[CONS_FILE]
+    if cons is None:
+        raise SystemExit("Cannot read consolidated file.")
+
+    rows = []
+
+    for fname, raw_path, trans_path in pairs:
+        fname_lower = fname.lower()
+
+        raw_cols  = results[raw_path]
+        trans_cols = results[trans_path]
+        if raw_cols is None or trans_cols is None:
+            continue
+
+        # consolidated counts of rows whose first column (lowercase) equals filename (lowercase)
+        cons_counts = cons["counts"].get(fname_lower, {})
+
+        for pos, (raw_head, raw_count) in enumerate(raw_cols):
+
+            # translated: match by position
+            if pos < len(trans_cols):
+                t_head, t_count = trans_cols[pos]
+            else:
+                t_head = t_count = None
+
+            # consolidated: use translated header + filename filter
+            if t_head and t_head in cons["columns"]:
+                c_count = cons_counts.get(t_head, 0)
+            else:
+                c_count = None
+
+            diff_raw_trans = (
+                None if (raw_count is None or t_count is None)
+                else raw_count - t_count
+            )
+            diff_trans_cons = (
+                None if (t_count is None or c_count is None)
+                else t_count - c_count
+            )
+
+            rows.append({
+                "file name": fname_lower,
+                "position": pos,
+                "raw header": raw_head,
+                "raw count": raw_count,
+                "translated header": t_head,
+                "translated count": t_count,
+                "consolidated count": c_count,
+                "diff raw-trans": diff_raw_trans,
+                "diff trans-cons": diff_trans_cons
+            })
+
+    summary = pd.DataFrame(rows)
+    summary.to_excel(OUTPUT, index=False)
+    print(f"Summary written to {OUTPUT}")
 
-        rows.append({
-            "file name": fname_lower,
-            "position": pos,
-            "raw header": raw_head,
-            "raw count": raw_count,
-            "translated header": t_head,
-            "translated count": t_count,
-            "consolidated count": c_count,
-            "diff raw-trans": diff_raw_trans,
-            "diff trans-cons": diff_trans_cons
-        })
-
-summary = pd.DataFrame(rows)
-summary.to_excel(OUTPUT, index=False)
-print(f"Summary written to {OUTPUT}")
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-import pygame
 from pygame.sprite import Sprite
 
+from asset_cache import assets
+
 
 class Alien(Sprite):
     """class represents single alien"""
+    image_path = "images/alien.bmp"
+    __slots__ = ('screen', 'settings', 'image', 'rect', 'x', 'previous_x')
+
     def __init__(self, ai_game):
         """initialize alien and set its starting position"""
         super().__init__()
@@ -11,23 +15,38 @@ class Alien(Sprite):
         self.settings = ai_game.settings
 
         # load alien image and set its rect attribute
-        self.image = pygame.image.load("images/alien.bmp")
+        self.image = assets.image(self.image_path)
         self.rect = self.image.get_rect()
 
         # start each alien near top left of screen
         self.rect.x = self.rect.width
         self.rect.y = self.rect.height
 
-        # store alien's exact horizontal position
+        # store alien's exact horizontal position, and where it was before the last tick
         self.x = float(self.rect.x)
+        self.previous_x = self.x
+
+    def place(self, x_position, y_position):
+        """move a new or recycled alien to its place in the fleet"""
+        self.x = x_position
+        self.previous_x = x_position
+        self.rect.x = x_position
+        self.rect.y = y_position
 
     def check_edges(self):
         """return true if alien is at the edge"""
         screen_rect = self.screen.get_rect()
         return (self.rect.right >= screen_rect.right) or (self.rect.left <= 0)
 
+    def interpolated_rect(self, alpha):
+        """return where to draw the alien, alpha of the way through the next tick"""
+        rect = self.rect.copy()
+        rect.x = self.previous_x + (self.x - self.previous_x) * alpha
+        return rect
+
     def update(self):
         """move alien to the right or left"""
+        self.previous_x = self.x
         self.x += self.settings.alien_speed * self.settings.fleet_direction
         self.rect.x = self.x
 
@@ -0,0 +1,195 @@
+import numpy as np
+import pygame
+from pygame.sprite import Sprite
+
+from alien import Alien
+from asset_cache import assets
+
+
+def to_pixels(x):
+    """round float positions the way assigning them to a pygame Rect does"""
+    whole = np.trunc(x)
+    # pygame rounds halves away from zero
+    return (whole + np.where(np.abs(x - whole) >= 0.5, np.sign(x), 0)).astype(np.int64)
+
+
+class FleetAlien(Sprite):
+    """read-only sprite view of one alien stored in an ArrayFleet"""
+    def __init__(self, image, rect):
+        super().__init__()
+        self.image = image
+        self.rect = rect
+
+
+class ArrayFleet:
+    """fleet of aliens stored in numpy arrays, used in place of the aliens group
+
+    every fleet wide step (movement, edge check, drop, bottom check and
+    collisions) is a single vectorized pass over the arrays
+    """
+
+    # below this many sprites one pass per sprite beats the fixed cost of the sweep
+    sweep_min_sprites = 8
+
+    def __init__(self, ai_game):
+        """initialize an empty fleet"""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        # every alien shares one image and size
+        self.image = assets.image(Alien.image_path)
+        self.width, self.height = self.image.get_size()
+
+        # exact horizontal positions before and after the last tick, rect positions and liveness
+        self.x = np.empty(0)
+        self.previous_x = self.x
+        self.rect_x = np.empty(0, dtype=np.int64)
+        self.rect_y = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        return iter(self.sprites())
+
+    def sprites(self):
+        """return sprite views of the living aliens"""
+        return [FleetAlien(self.image, pygame.Rect(x, y, self.width, self.height))
+                for x, y in zip(self.rect_x[self.alive].tolist(), self.rect_y[self.alive].tolist())]
+
+    def create_fleet(self):
+        """lay the fleet out like AlienInvation._create_fleet does"""
+        xs = np.arange(self.width, self.settings.screen_width - 2 * self.width, 2 * self.width)
+        ys = np.arange(self.height, self.settings.screen_height - 3 * self.height, 2 * self.height)
+        grid_y, grid_x = np.meshgrid(ys, xs, indexing='ij')
+        self.rect_x = grid_x.ravel().astype(np.int64)
+        self.rect_y = grid_y.ravel().astype(np.int64)
+        self.x = self.rect_x.astype(float)
+        self.previous_x = self.x
+        self.alive = np.ones(self.rect_x.size, dtype=bool)
+        self.count = self.rect_x.size
+
+    def load(self, x, rect_x, rect_y):
+        """replace the fleet with living aliens at the given positions"""
+        self.x = np.array(x, dtype=float)
+        self.previous_x = self.x
+        self.rect_x = np.array(rect_x, dtype=np.int64)
+        self.rect_y = np.array(rect_y, dtype=np.int64)
+        self.alive = np.ones(self.x.size, dtype=bool)
+        self.count = self.x.size
+
+    def empty(self):
+        """remove every alien"""
+        self.alive[:] = False
+        self.count = 0
+
+    def update(self):
+        """move the whole fleet to the right or left"""
+        self.previous_x = self.x
+        self.x = self.x + self.settings.alien_speed * self.settings.fleet_direction
+        self.rect_x = to_pixels(self.x)
+
+    def check_edges(self):
+        """return true if any alien is at the edge"""
+        rect_x = self.rect_x[self.alive]
+        screen_right = self.screen.get_rect().right
+        return bool(np.any((rect_x + self.width >= screen_right) | (rect_x <= 0)))
+
+    def drop(self, distance):
+        """move the whole fleet down"""
+        self.rect_y += distance
+
+    def check_bottom(self):
+        """return true if any alien has reached the bottom of the screen"""
+        return bool(np.any(self.rect_y[self.alive] + self.height >= self.settings.screen_height))
+
+    def _overlaps(self, rect):
+        """return a mask of living aliens overlapping rect"""
+        return (self.alive
+                & (self.rect_x < rect.right) & (self.rect_x + self.width > rect.left)
+                & (self.rect_y < rect.bottom) & (self.rect_y + self.height > rect.top))
+
+    def collideany(self, sprite):
+        """return true if any alien collides with sprite"""
+        return bool(np.any(self._overlaps(sprite.rect)))
+
+    def groupcollide(self, group, dokill, dokill_fleet):
+        """like pygame.sprite.groupcollide, values are arrays of alien indices
+
+        living aliens are sorted by x once, each sprite's x range is found
+        by binary search and only those candidates are tested on y, all as
+        whole-array passes. sprites are only visited to build the result
+        """
+        sprites = group.sprites()
+        if len(sprites) < self.sweep_min_sprites:
+            return self._groupcollide_each(sprites, dokill, dokill_fleet)
+        living = np.flatnonzero(self.alive)
+        if not living.size:
+            return {}
+        left, top, width, height = np.array([tuple(sprite.rect) for sprite in sprites]).T
+        by_x = np.argsort(self.rect_x[living], kind='stable')
+        sorted_x = self.rect_x[living][by_x]
+        first = np.searchsorted(sorted_x, left - self.width, 'right')
+        counts = np.maximum(np.searchsorted(sorted_x, left + width, 'left') - first, 0)
+
+        # one (sprite, alien) candidate pair per alien in a sprite's x range
+        rows = np.repeat(np.arange(len(sprites)), counts)
+        steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        columns = by_x[np.repeat(first, counts) + steps]
+        rect_y = self.rect_y[living][columns]
+        hit = (rect_y < top[rows] + height[rows]) & (rect_y + self.height > top[rows])
+        rows, columns = rows[hit], columns[hit]
+        order = np.lexsort((columns, rows))
+        rows, columns = rows[order], columns[order]
+
+        if dokill_fleet:
+            # like groupcollide, an alien killed by one sprite is not hit by the later ones,
+            # so each alien goes to the first sprite overlapping it
+            _, first_hit = np.unique(columns, return_index=True)
+            first_hit.sort()
+            rows, columns = rows[first_hit], columns[first_hit]
+            self.alive[living[columns]] = False
+            self.count -= columns.size
+
+        crashed = {}
+        starts = np.flatnonzero(np.diff(rows, prepend=-1))
+        for row, hits in zip(rows[starts].tolist(), np.split(living[columns], starts[1:])):
+            sprite = sprites[row]
+            crashed[sprite] = hits
+            if dokill:
+                sprite.kill()
+        return crashed
+
+    def _groupcollide_each(self, sprites, dokill, dokill_fleet):
+        """groupcollide with one pass over the fleet per sprite"""
+        crashed = {}
+        for sprite in sprites:
+            hits = np.flatnonzero(self._overlaps(sprite.rect))
+            if hits.size:
+                crashed[sprite] = hits
+                if dokill_fleet:
+                    self.alive[hits] = False
+                    self.count -= hits.size
+                if dokill:
+                    sprite.kill()
+        return crashed
+
+    def draw(self, surface, alpha=1.0):
+        """blit every living alien in one call and return the rects drawn
+
+        alpha interpolates between the positions before and after the last tick
+        """
+        alive = self.alive
+        if alpha == 1.0:
+            rect_x = self.rect_x[alive]
+        else:
+            previous_x = self.previous_x[alive]
+            rect_x = to_pixels(previous_x + (self.x[alive] - previous_x) * alpha)
+        image = self.image
+        return surface.blits([(image, position) for position in zip(
+            rect_x.tolist(), self.rect_y[alive].tolist())])
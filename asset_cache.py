@@ -0,0 +1,186 @@
+import os
+import struct
+import sys
+from time import perf_counter
+
+import pygame
+
+# bundle layout: header, then per image its path, size, pixel format, the
+# mtime and size of the source file it was built from and raw pixels
+BUNDLE_MAGIC = b'AIB2'
+BUNDLE_HEADER = struct.Struct('<4sI')
+BUNDLE_ENTRY = struct.Struct('<HHH4sIqq')
+
+
+def source_stamp(image_path):
+    """(mtime in ns, size) of a source image, None if it is gone"""
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_bundle(path):
+    """return [(image path, source stamp, width, height, pixel format, pixels)] of a bundle
+
+    None if there is no bundle
+    """
+    try:
+        with open(path, 'rb') as bundle:
+            data = bundle.read()
+    except FileNotFoundError:
+        return None
+
+    magic, count = BUNDLE_HEADER.unpack_from(data)
+    if magic != BUNDLE_MAGIC:
+        raise ValueError(f"{path} is not an asset bundle")
+    entries = []
+    offset = BUNDLE_HEADER.size
+    for _ in range(count):
+        path_length, width, height, pixel_format, size, *stamp = BUNDLE_ENTRY.unpack_from(data, offset)
+        offset += BUNDLE_ENTRY.size
+        image_path = data[offset:offset + path_length].decode()
+        offset += path_length
+        entries.append((image_path, tuple(stamp), width, height, pixel_format.decode().strip(),
+                        data[offset:offset + size]))
+        offset += size
+    return entries
+
+
+class AssetCache:
+    """loads each image and font once per process and shares them between sprites"""
+
+    def __init__(self):
+        """initialize an empty cache"""
+        self.images = {}
+        self.fonts = {}
+        # bundles already loaded into the cache
+        self.bundles = set()
+        # per path: number of disk loads, cache hits and seconds spent loading
+        self.loads = {}
+        self.hits = {}
+        self.load_time = {}
+
+    def image(self, path):
+        """return the cached surface for path, loading it on first use
+
+        once a display mode is set the image is converted to its pixel
+        format, headless runs keep the surface as loaded
+        """
+        image = self.images.get(path)
+        if image is not None:
+            self.hits[path] += 1
+            return image
+
+        start = perf_counter()
+        image = self._store(path, pygame.image.load(path), start)
+        return image
+
+    def _store(self, path, image, start):
+        """convert a freshly loaded image for the display, cache it and count the load"""
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            if image.get_alpha() is None:
+                image = image.convert()
+            else:
+                image = image.convert_alpha()
+        self.images[path] = image
+        self.loads[path] = self.loads.get(path, 0) + 1
+        self.hits.setdefault(path, 0)
+        self.load_time[path] = self.load_time.get(path, 0.0) + perf_counter() - start
+        return image
+
+    def font(self, name, size):
+        """return a shared font, None is pygame's default font
+
+        the default font is opened directly, SysFont would first scan every
+        font installed on the system
+        """
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            if name is None:
+                font = pygame.font.Font(None, size)
+            else:
+                font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def load_bundle(self, path):
+        """load every image in a bundle written by build_bundle into the cache, once per process
+
+        returns false, leaving images to be loaded one by one, if there is no
+        bundle. a bundle whose source images changed since it was built is
+        built again from them first, sources that are gone keep their entry
+        """
+        if path in self.bundles:
+            return True
+        start = perf_counter()
+        entries = read_bundle(path)
+        if entries is None:
+            return False
+        if any(source_stamp(image_path) not in (None, stamp) for image_path, stamp, *_ in entries):
+            try:
+                build_bundle(path, [image_path for image_path, *_ in entries])
+            except (OSError, pygame.error):
+                # the changed images are read from their sources instead
+                return False
+            entries = read_bundle(path)
+
+        for image_path, _, width, height, pixel_format, pixels in entries:
+            image = pygame.image.frombytes(pixels, (width, height), pixel_format)
+            self._store(image_path, image, start)
+            start = perf_counter()
+        self.bundles.add(path)
+        return True
+
+    def clear(self):
+        """drop cached surfaces, e.g. after the display mode changes"""
+        self.images.clear()
+        self.bundles.clear()
+
+    def report(self):
+        """return load counts and timings for every image seen"""
+        lines = []
+        for path in sorted(self.loads):
+            lines.append(f"{path}: {self.loads[path]} loads, {self.hits[path]} hits, "
+                         f"{self.load_time[path] * 1000:.2f} ms loading")
+        return "\n".join(lines)
+
+
+def build_bundle(path, image_paths):
+    """decode images once and write their raw pixels into a single bundle file
+
+    the file is replaced only once it is complete
+    """
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as bundle:
+        bundle.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, len(image_paths)))
+        for image_path in image_paths:
+            image = pygame.image.load(image_path)
+            pixel_format = 'RGB' if image.get_alpha() is None else 'RGBA'
+            pixels = pygame.image.tobytes(image, pixel_format)
+            encoded_path = image_path.encode()
+            bundle.write(BUNDLE_ENTRY.pack(len(encoded_path), image.get_width(), image.get_height(),
+                                           pixel_format.ljust(4).encode(), len(pixels),
+                                           *source_stamp(image_path)))
+            bundle.write(encoded_path)
+            bundle.write(pixels)
+    os.replace(temporary_path, path)
+
+
+# shared by every sprite in the process
+assets = AssetCache()
+
+
+if __name__ == '__main__':
+    # rebuild the bundle the game loads at startup:
+    #     python asset_cache.py [bundle path] [image paths...]
+    from settings import Settings
+    from alien import Alien
+    from ship import Ship
+
+    bundle_path = sys.argv[1] if len(sys.argv) > 1 else Settings().asset_bundle
+    image_paths = sys.argv[2:] or [Alien.image_path, Ship.image_path]
+    build_bundle(bundle_path, image_paths)
+    print(f"bundled {', '.join(image_paths)} into {bundle_path}")
@@ -0,0 +1,262 @@
+"""advance many independent Alien Invasion games in lock-step with numpy
+
+measure throughput from the repository root with: python batch_sim.py [games] [ticks]
+"""
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from settings import Settings
+from alien import Alien
+from ship import Ship
+from asset_cache import assets
+from array_fleet import to_pixels
+
+# action bits, one uint8 per game and step
+LEFT, RIGHT, FIRE, PLAY = 1, 2, 4, 8
+
+
+class BatchedGames:
+    """n headless games stored as batched arrays, one row per game
+
+    the rules follow AlienInvation.step exactly: the same actions give the
+    same ship, bullet and alien positions, score, level and ships left
+    """
+
+    def __init__(self, n_games, settings=None):
+        """initialize n games in the state a new AlienInvation starts in"""
+        self.n = n_games
+        self.settings = settings or Settings()
+        settings = self.settings
+        self.screen_width = settings.screen_width
+        self.screen_height = settings.screen_height
+
+        self.ship_width, self.ship_height = assets.image(Ship.image_path).get_size()
+        self.alien_width, self.alien_height = assets.image(Alien.image_path).get_size()
+        self.ship_top = self.screen_height - self.ship_height
+
+        # fleet layout shared by every game, the same as _create_fleet
+        xs = np.arange(self.alien_width, self.screen_width - 2 * self.alien_width, 2 * self.alien_width)
+        ys = np.arange(self.alien_height, self.screen_height - 3 * self.alien_height, 2 * self.alien_height)
+        grid_y, grid_x = np.meshgrid(ys, xs, indexing='ij')
+        self.layout_x = grid_x.ravel().astype(np.int64)
+        self.layout_y = grid_y.ravel().astype(np.int64)
+        n_aliens = self.layout_x.size
+        n_bullets = settings.bullets_allowed
+        self.rows = np.arange(n_games)
+
+        # ship
+        self.ship_x = np.zeros(n_games)
+        self.ship_rect_x = np.zeros(n_games, dtype=np.int64)
+
+        # bullets in fixed slots, seq keeps the order they were fired in
+        self.bullet_y = np.zeros((n_games, n_bullets))
+        self.bullet_rect_x = np.zeros((n_games, n_bullets), dtype=np.int64)
+        self.bullet_rect_y = np.zeros((n_games, n_bullets), dtype=np.int64)
+        self.bullet_alive = np.zeros((n_games, n_bullets), dtype=bool)
+        self.bullet_seq = np.zeros((n_games, n_bullets), dtype=np.int64)
+        self.fired = 0
+
+        # aliens
+        self.alien_x = np.zeros((n_games, n_aliens))
+        self.alien_rect_x = np.zeros((n_games, n_aliens), dtype=np.int64)
+        self.alien_rect_y = np.zeros((n_games, n_aliens), dtype=np.int64)
+        self.alien_alive = np.zeros((n_games, n_aliens), dtype=bool)
+
+        # dynamic settings
+        self.ship_speed = np.zeros(n_games)
+        self.bullet_speed = np.zeros(n_games)
+        self.alien_speed = np.zeros(n_games)
+        self.fleet_direction = np.zeros(n_games, dtype=np.int64)
+        self.alien_points = np.zeros(n_games, dtype=np.int64)
+
+        # statistics and game flow
+        self.ships_left = np.zeros(n_games, dtype=np.int64)
+        self.score = np.zeros(n_games, dtype=np.int64)
+        self.level = np.zeros(n_games, dtype=np.int64)
+        self.game_active = np.zeros(n_games, dtype=bool)
+        self.pause_ticks = np.zeros(n_games, dtype=np.int64)
+        self.ticks = 0
+
+        everyone = np.ones(n_games, dtype=bool)
+        self._initialize_dynamic_settings(everyone)
+        self._reset_stats(everyone)
+        self._create_fleet(everyone)
+        self._center_ship(everyone)
+
+    def _initialize_dynamic_settings(self, games):
+        """Settings.initialize_dynamic_settings for the selected games"""
+        settings = self.settings
+        settings.initialize_dynamic_settings()
+        self.ship_speed[games] = settings.ship_speed
+        self.bullet_speed[games] = settings.bullet_speed
+        self.alien_speed[games] = settings.alien_speed
+        self.fleet_direction[games] = settings.fleet_direction
+        self.alien_points[games] = settings.alien_points
+
+    def _increase_speed(self, games):
+        """Settings.increase_speed for the selected games"""
+        scale = self.settings.speedup_scale
+        self.ship_speed[games] *= scale
+        self.bullet_speed[games] *= scale
+        self.alien_speed[games] *= scale
+        self.alien_points[games] = (self.alien_points[games] * self.settings.score_scale).astype(np.int64)
+
+    def _reset_stats(self, games):
+        """GameStats.reset_stats for the selected games"""
+        self.ships_left[games] = self.settings.ship_limit
+        self.score[games] = 0
+        self.level[games] = 1
+
+    def _create_fleet(self, games):
+        """replace the fleet of the selected games with a full one"""
+        self.alien_x[games] = self.layout_x
+        self.alien_rect_x[games] = self.layout_x
+        self.alien_rect_y[games] = self.layout_y
+        self.alien_alive[games] = True
+
+    def _center_ship(self, games):
+        """Ship.center_ship for the selected games"""
+        x = self.screen_width // 2 - self.ship_width // 2
+        self.ship_x[games] = x
+        self.ship_rect_x[games] = x
+
+    def _start_game(self, games):
+        """AlienInvation._start_game for the selected games"""
+        self._initialize_dynamic_settings(games)
+        self._reset_stats(games)
+        self.game_active[games] = True
+        self.bullet_alive[games] = False
+        self._create_fleet(games)
+        self._center_ship(games)
+
+    def _fire_bullet(self, games):
+        """fire a bullet from the ship in every selected game with one to spare
+
+        games paused after the ship was hit drop the shot
+        """
+        games = games & (self.pause_ticks == 0) & (self.bullet_alive.sum(axis=1) < self.bullet_alive.shape[1])
+        rows = np.flatnonzero(games)
+        if not rows.size:
+            return
+        slots = np.argmin(self.bullet_alive[rows], axis=1)
+        width = self.settings.bullet_width
+        self.bullet_rect_x[rows, slots] = self.ship_rect_x[rows] + self.ship_width // 2 - width // 2
+        self.bullet_rect_y[rows, slots] = self.ship_top
+        self.bullet_y[rows, slots] = self.ship_top
+        self.bullet_alive[rows, slots] = True
+        self.fired += 1
+        self.bullet_seq[rows, slots] = self.fired
+
+    def _ship_hit(self, games):
+        """AlienInvation._ship_hit for the selected games"""
+        lives = games & (self.ships_left > 0)
+        self.ships_left[lives] -= 1
+        self.bullet_alive[lives] = False
+        self._create_fleet(lives)
+        self._center_ship(lives)
+        self.pause_ticks[lives] = round(self.settings.ship_hit_pause * self.settings.ticks_per_second)
+        self.game_active[games & ~lives] = False
+
+    def step(self, actions):
+        """advance every game by one tick given an array of action bits per game"""
+        actions = np.asarray(actions)
+        self._start_game((actions & PLAY).astype(bool) & ~self.game_active)
+        moving_left = (actions & LEFT).astype(bool)
+        moving_right = (actions & RIGHT).astype(bool)
+        self._fire_bullet((actions & FIRE).astype(bool))
+
+        self.ticks += 1
+        paused = self.pause_ticks > 0
+        self.pause_ticks[paused] -= 1
+        running = self.game_active & ~paused
+        if running.any():
+            self._update_ship(running, moving_left, moving_right)
+            self._update_bullets(running)
+            self._update_aliens(running)
+        return self.game_active
+
+    def _update_ship(self, running, moving_left, moving_right):
+        """Ship.update for the running games"""
+        x = self.ship_x
+        rect_x = self.ship_rect_x
+        right = running & moving_right & (rect_x + self.ship_width < self.screen_width)
+        left = running & moving_left & (rect_x > 0)
+        x = np.where(right, x + self.ship_speed, x)
+        x = np.where(left, x - self.ship_speed, x)
+        self.ship_x = x
+        self.ship_rect_x = np.where(running, to_pixels(x), rect_x)
+
+    def _update_bullets(self, running):
+        """move bullets, drop those off screen and resolve collisions"""
+        moving = self.bullet_alive & running[:, None]
+        self.bullet_y = np.where(moving, self.bullet_y - self.bullet_speed[:, None], self.bullet_y)
+        self.bullet_rect_y = np.where(moving, to_pixels(self.bullet_y), self.bullet_rect_y)
+        self.bullet_alive &= ~(moving & (self.bullet_rect_y + self.settings.bullet_height <= 0))
+        self._check_bullet_alien_collision(running)
+
+    def _check_bullet_alien_collision(self, running):
+        """groupcollide semantics: bullets in firing order each kill every alien they touch"""
+        alien_x = self.alien_rect_x
+        alien_y = self.alien_rect_y
+        width, height = self.settings.bullet_width, self.settings.bullet_height
+        order = np.argsort(np.where(self.bullet_alive, self.bullet_seq, np.iinfo(np.int64).max), axis=1)
+        for rank in range(order.shape[1]):
+            slots = order[:, rank]
+            live = self.bullet_alive[self.rows, slots] & running
+            if not live.any():
+                break
+            bullet_x = self.bullet_rect_x[self.rows, slots][:, None]
+            bullet_y = self.bullet_rect_y[self.rows, slots][:, None]
+            hits = (self.alien_alive & live[:, None]
+                    & (alien_x < bullet_x + width) & (alien_x + self.alien_width > bullet_x)
+                    & (alien_y < bullet_y + height) & (alien_y + self.alien_height > bullet_y))
+            counts = hits.sum(axis=1)
+            self.alien_alive &= ~hits
+            self.bullet_alive[self.rows, slots] &= counts == 0
+            self.score += self.alien_points * counts
+
+        # a cleared fleet starts the next level
+        cleared = running & ~self.alien_alive.any(axis=1)
+        if cleared.any():
+            self.bullet_alive[cleared] = False
+            self._create_fleet(cleared)
+            self._increase_speed(cleared)
+            self.level[cleared] += 1
+
+    def _update_aliens(self, running):
+        """edges, drop, movement, ship collision and bottom check for the running games"""
+        alive = self.alien_alive
+        at_edge = running & (alive & ((self.alien_rect_x + self.alien_width >= self.screen_width)
+                                      | (self.alien_rect_x <= 0))).any(axis=1)
+        self.alien_rect_y[at_edge] += self.settings.fleet_drop_speed
+        self.fleet_direction[at_edge] *= -1
+
+        step = (self.alien_speed * self.fleet_direction)[:, None]
+        self.alien_x = np.where(running[:, None], self.alien_x + step, self.alien_x)
+        self.alien_rect_x = np.where(running[:, None], to_pixels(self.alien_x), self.alien_rect_x)
+
+        ship_x = self.ship_rect_x[:, None]
+        touching = (self.alien_alive
+                    & (self.alien_rect_x < ship_x + self.ship_width) & (self.alien_rect_x + self.alien_width > ship_x)
+                    & (self.alien_rect_y < self.ship_top + self.ship_height)
+                    & (self.alien_rect_y + self.alien_height > self.ship_top))
+        self._ship_hit(running & touching.any(axis=1))
+
+        bottom = (self.alien_alive & (self.alien_rect_y + self.alien_height >= self.screen_height)).any(axis=1)
+        self._ship_hit(running & bottom)
+
+
+if __name__ == '__main__':
+    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    games = BatchedGames(n_games)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 8, size=(n_ticks, n_games), dtype=np.uint8) | PLAY
+    start = perf_counter()
+    for tick_actions in actions:
+        games.step(tick_actions)
+    elapsed = perf_counter() - start
+    print(f"{n_games} games x {n_ticks} ticks in {elapsed:.2f}s: "
+          f"{n_games * n_ticks / elapsed:,.0f} game-steps/s")
@@ -0,0 +1,86 @@
+"""compare pygame's all-pairs groupcollide with the spatial hash broad phase
+
+run from the repository root with: python -m benchmarks.collisions
+"""
+import random
+import timeit
+
+import pygame
+from pygame.sprite import Group, Sprite
+
+from spatial_hash import SpatialHash
+
+
+def make_group(rects):
+    """build a sprite group from plain rects"""
+    group = Group()
+    for rect in rects:
+        sprite = Sprite()
+        sprite.rect = rect
+        group.add(sprite)
+    return group
+
+
+def make_fleet(screen_width, screen_height, alien_width=60, alien_height=58):
+    """lay out aliens the same way AlienInvation._create_fleet does"""
+    rects = []
+    y = alien_height
+    while y < screen_height - 3 * alien_height:
+        x = alien_width
+        while x < screen_width - 2 * alien_width:
+            rects.append(pygame.Rect(x, y, alien_width, alien_height))
+            x += 2 * alien_width
+        y += 2 * alien_height
+    return make_group(rects)
+
+
+def make_bullets(count, screen_width, screen_height, rng):
+    """scatter bullets over the screen"""
+    return make_group(
+        pygame.Rect(rng.randrange(screen_width), rng.randrange(screen_height), 3, 15)
+        for _ in range(count)
+    )
+
+
+def same_hits(expected, actual):
+    """compare two groupcollide results"""
+    return expected.keys() == actual.keys() and all(expected[k] == actual[k] for k in expected)
+
+
+def move_fleet(aliens, dx, dy):
+    """shift the whole fleet the way alien updates and drops do"""
+    for alien in aliens:
+        alien.rect.move_ip(dx, dy)
+
+
+def main():
+    rng = random.Random(0)
+    grid = SpatialHash(120)
+    print(f"{'screen':>11} {'aliens':>7} {'bullets':>8} {'pairs ms':>9} {'grid ms':>8} {'speedup':>8}")
+    for screen_width, screen_height in [(1200, 800), (1920, 1080), (3840, 2160), (7680, 4320)]:
+        aliens = make_fleet(screen_width, screen_height)
+        for bullet_count in (3, 30, 300):
+            bullets = make_bullets(bullet_count, screen_width, screen_height, rng)
+
+            def brute():
+                return pygame.sprite.groupcollide(bullets, aliens, False, False)
+
+            grid.rebuild(aliens)
+
+            def hashed():
+                return grid.groupcollide(bullets, False, False)
+
+            # the grid is built once per fleet and follows it as it moves
+            move_fleet(aliens, rng.randrange(-60, 60), rng.randrange(0, 60))
+            if not same_hits(brute(), hashed()):
+                raise SystemExit("spatial hash disagrees with groupcollide")
+
+            number = 20
+            brute_ms = min(timeit.repeat(brute, number=number, repeat=3)) / number * 1000
+            hashed_ms = min(timeit.repeat(hashed, number=number, repeat=3)) / number * 1000
+            print(f"{screen_width:>5}x{screen_height:<5} {len(aliens):>7} {bullet_count:>8} "
+                  f"{brute_ms:>9.3f} {hashed_ms:>8.3f} {brute_ms / hashed_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""benchmark the game engine's hot paths off-screen at increasing scale
+
+run from a directory with the game's images/ folder, e.g.
+    python -m benchmarks.engine --save engine_baseline.json
+    python -m benchmarks.engine --compare engine_baseline.json
+"""
+from benchmarks.harness import run_suite
+
+from settings import Settings
+from main import AlienInvation
+
+SCREEN_SIZES = [(1200, 800), (1920, 1080), (3840, 2160)]
+FLEETS = {'sprite': False, 'array': True}
+
+
+def make_game(width, height, array_fleet=False, **overrides):
+    """return an active headless game on an off-screen surface of the given size"""
+    settings = Settings()
+    settings.screen_width = width
+    settings.screen_height = height
+    settings.array_fleet = array_fleet
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    game = AlienInvation(headless=True, settings=settings)
+    game.step({'play'})
+    return game
+
+
+def reset_fleet(game):
+    """put back a full fleet and no bullets"""
+    game._empty_bullets()
+    game._empty_aliens()
+    game._create_fleet()
+    game.settings.initialize_dynamic_settings()
+
+
+def load_bullets(game, count):
+    """spread count bullets over the fleet's rows, about half of them on an alien"""
+    reset_fleet(game)
+    width = game.settings.screen_width
+    height = game.settings.screen_height
+    for number in range(count):
+        bullet = game.bullet_pool.acquire()
+        bullet.reset()
+        bullet.rect.x = (number * 37) % width
+        bullet.rect.y = (number * 53) % (height // 2) + 60
+        bullet.y = float(bullet.rect.y)
+        game.bullets.add(bullet)
+
+
+def fleet_cases(cases):
+    for (width, height), (fleet, array_fleet) in [(size, fleet) for size in SCREEN_SIZES for fleet in FLEETS.items()]:
+        game = make_game(width, height, array_fleet)
+        size = f"{width}x{height}"
+
+        cases[f"create_fleet[{size},{fleet}]"] = (
+            game._create_fleet, lambda game=game: (game._empty_aliens()))
+        cases[f"update_aliens[{size},{fleet}]"] = (
+            game._update_aliens, lambda game=game: reset_fleet(game))
+
+        for count in (3, 30, 300):
+            bullet_game = make_game(width, height, array_fleet, bullets_allowed=count)
+            cases[f"update_bullets+collision[{size},{fleet},{count} bullets]"] = (
+                bullet_game._update_bullets, lambda game=bullet_game, count=count: load_bullets(game, count))
+
+
+def hud_cases(cases):
+    game = make_game(1200, 800)
+    stats, sb = game.stats, game.sb
+
+    def bump_score():
+        stats.score += 50
+
+    def lose_ship():
+        stats.ships_left = (stats.ships_left - 1) % (game.settings.ship_limit + 1)
+
+    def level_up():
+        stats.level += 1
+
+    cases["scoreboard.prep_score"] = (sb.prep_score, bump_score)
+    cases["scoreboard.prep_high_score"] = (sb.prep_high_score, lambda: setattr(stats, 'high_score', stats.high_score + 50))
+    cases["scoreboard.prep_level"] = (sb.prep_level, level_up)
+    cases["scoreboard.prep_ships"] = (sb.prep_ships, lose_ship)
+
+
+def thin_fleet(game, count):
+    """keep only the first count aliens of a sprite fleet, as late in a level"""
+    for alien in game.aliens.sprites()[count:]:
+        game.aliens.remove(alien)
+        game.alien_pool.release(alien)
+
+
+def screen_cases(cases):
+    for width, height in SCREEN_SIZES:
+        for mode, dirty in (('full', False), ('dirty', True)):
+            game = make_game(width, height, dirty_rendering=dirty)
+            game._update_screen()
+            cases[f"update_screen[{width}x{height},{mode}]"] = (game._update_screen, lambda game=game: game.step())
+
+            # dirty rendering only draws less once most of the fleet is gone
+            game = make_game(width, height, dirty_rendering=dirty)
+            thin_fleet(game, 3)
+            game._update_screen()
+            cases[f"update_screen[{width}x{height},{mode},3 aliens]"] = (
+                game._update_screen, lambda game=game: game.step())
+
+
+def build_cases():
+    cases = {}
+    fleet_cases(cases)
+    hud_cases(cases)
+    screen_cases(cases)
+    return cases
+
+
+if __name__ == '__main__':
+    run_suite("Alien Invasion engine benchmarks", build_cases)
@@ -0,0 +1,66 @@
+"""benchmark each stage of the claims forecast on synthetic extracts, with peak memory
+
+run from the repository root, e.g.
+    python -m benchmarks.forecast --save forecast_baseline.json
+    python -m benchmarks.forecast --compare forecast_baseline.json --filter 100k
+
+peak MB counts what python and numpy allocate (tracemalloc), not memory
+pyarrow allocates on its own
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.harness import run_suite
+
+from claims_synthetic import generate
+from claims_ingest import compact, load_claims, month_ordinals, read_source
+from claims_forecast import build_triangle, forecast, recent_ratios
+
+# label: (claims, countries)
+SIZES = {'10k': (10_000, 100), '100k': (100_000, 1_000), '1m': (1_000_000, 5_000)}
+# writing a workbook for the load cases takes too long beyond these
+EXCEL_SIZES = ('10k', '100k')
+
+
+def stage_cases(cases, label, rows, countries, directory):
+    """time every stage of Test.py on one synthetic extract"""
+    raw = pd.concat(generate(rows, countries=countries, seed=0), ignore_index=True)
+    claims = compact(raw)
+    triangle = build_triangle(claims)
+    forecast_df = forecast(triangle)
+
+    if label in EXCEL_SIZES:
+        path = os.path.join(directory, f"claims-{label}.xlsx")
+        cache_dir = os.path.join(directory, 'cache')
+        raw.to_excel(path, index=False)
+        load_claims(path, cache_dir)
+        cases[f"load[excel,{label}]"] = (lambda: read_source(path), None)
+        cases[f"load[parquet cache,{label}]"] = (lambda: load_claims(path, cache_dir), None)
+
+    cases[f"period_conversion[{label}]"] = (
+        lambda: (month_ordinals(raw['Departure_Month']), month_ordinals(raw['Claim_Month'])), None)
+    cases[f"lag[{label}]"] = (
+        lambda: (claims['Claim_Month'] - claims['Departure_Month']).astype(np.int16), None)
+    cases[f"triangle[{label}]"] = (lambda: build_triangle(claims), None)
+    cases[f"ratios[{label}]"] = (lambda: recent_ratios(triangle), None)
+    cases[f"forecast[{label}]"] = (lambda: forecast(triangle), None)
+    cases[f"export[{label}]"] = (
+        lambda: forecast_df.to_excel(os.path.join(directory, 'claims_forecast_output.xlsx'), index=False), None)
+
+
+def build_cases():
+    directory = tempfile.mkdtemp(prefix='forecast-bench-')
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    cases = {}
+    for label, (rows, countries) in SIZES.items():
+        stage_cases(cases, label, rows, countries, directory)
+    return cases
+
+
+if __name__ == '__main__':
+    run_suite("Time each stage of the claims forecast", build_cases, memory=True)
@@ -0,0 +1,114 @@
+"""timing, baselines and regression checks shared by the benchmark suites"""
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+
+
+def measure(func, setup=None, min_time=0.2, min_runs=5, memory=False):
+    """time func repeatedly, calling setup untimed before every run
+
+    returns ops/sec and per-run percentiles in milliseconds. with memory,
+    one more untimed run under tracemalloc adds the peak MB it allocated
+    """
+    times = []
+    total = 0.0
+    while total < min_time or len(times) < min_runs:
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        func()
+        elapsed = perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    times.sort()
+
+    def percentile(fraction):
+        return times[min(len(times) - 1, int(fraction * len(times)))] * 1000
+
+    result = {
+        'runs': len(times),
+        'ops_per_sec': len(times) / total,
+        'mean_ms': total / len(times) * 1000,
+        'p50_ms': percentile(0.5),
+        'p90_ms': percentile(0.9),
+        'p99_ms': percentile(0.99),
+    }
+    if memory:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            func()
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, threshold):
+    """return (name, unit, baseline, current) for cases worse than the baseline by more than threshold
+
+    a case regresses when it is slower, or when it measured memory and its
+    peak grew
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        if result['ops_per_sec'] < previous['ops_per_sec'] * (1 - threshold):
+            regressions.append((name, 'ops/s', previous['ops_per_sec'], result['ops_per_sec']))
+        if 'peak_mb' in result and 'peak_mb' in previous and result['peak_mb'] > previous['peak_mb'] * (1 + threshold):
+            regressions.append((name, 'peak MB', previous['peak_mb'], result['peak_mb']))
+    return regressions
+
+
+def run_suite(description, cases, memory=False):
+    """command line entry point for a suite of {name: (func, setup)} cases
+
+    cases may also be a callable returning them, so setup work can wait for
+    the arguments to be parsed. memory also records each case's peak MB
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this")
+    parser.add_argument('--min-time', type=float, default=0.2, help="seconds to spend per case")
+    parser.add_argument('--min-runs', type=int, default=5, help="runs per case, however long they take")
+    parser.add_argument('--save', metavar='PATH', help="write results as a JSON baseline")
+    parser.add_argument('--compare', metavar='PATH', help="flag regressions against a JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="fraction slower than the baseline counted as a regression")
+    args = parser.parse_args()
+
+    if callable(cases):
+        cases = cases()
+    results = {}
+    width = max(len(name) for name in cases)
+    print(f"{'case':<{width}} {'ops/s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}"
+          + (f" {'peak MB':>9}" if memory else ""))
+    for name, (func, setup) in cases.items():
+        if args.filter not in name:
+            continue
+        result = measure(func, setup, min_time=args.min_time, min_runs=args.min_runs, memory=memory)
+        results[name] = result
+        print(f"{name:<{width}} {result['ops_per_sec']:>10,.1f} {result['p50_ms']:>9.3f} "
+              f"{result['p90_ms']:>9.3f} {result['p99_ms']:>9.3f}"
+              + (f" {result['peak_mb']:>9.1f}" if memory else ""))
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({'python': sys.version.split()[0], 'machine': platform.machine(),
+                       'results': results}, baseline_file, indent=2)
+        print(f"baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold)
+        for name, unit, before, after in regressions:
+            print(f"REGRESSION {name}: {before:,.1f} -> {after:,.1f} {unit} ({after / before - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
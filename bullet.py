@@ -4,27 +4,42 @@ from pygame.sprite import Sprite
 
 class Bullet(Sprite):
     """class to manage bullets"""
+    __slots__ = ('screen', 'settings', 'ship', 'color', 'rect', 'y', 'previous_y')
+
     def __init__(self, ai_game):
         """create bullet object at ship's current position"""
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
+        self.ship = ai_game.ship
         self.color = self.settings.bullet_color
 
         # create bullet at 0, 0 and then set correct position
         self.rect = pygame.Rect(0, 0, self.settings.bullet_width, self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+        self.reset()
+
+    def reset(self):
+        """move a new or recycled bullet to the ship's current position"""
+        self.rect.midtop = self.ship.rect.midtop
 
-        # store bullet's position
+        # store bullet's position, and where it was before the last tick
         self.y = float(self.rect.y)
+        self.previous_y = self.y
 
     def update(self):
         """move bullet up"""
         # update exact position of bullet
+        self.previous_y = self.y
         self.y -= self.settings.bullet_speed
         # update rect position
         self.rect.y = self.y
 
+    def interpolated_rect(self, alpha):
+        """return where to draw the bullet, alpha of the way through the next tick"""
+        rect = self.rect.copy()
+        rect.y = self.previous_y + (self.y - self.previous_y) * alpha
+        return rect
+
     def draw_bullet(self):
         """draw bullet to the screen"""
         pygame.draw.rect(self.screen, self.color, self.rect)
@@ -1,4 +1,6 @@
-import pygame.font
+import pygame
+
+from asset_cache import assets
 
 
 class Button:
@@ -13,7 +15,7 @@ class Button:
         self.width, self.height = 200, 50
         self.button_color = (0, 135, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = assets.font(None, 48)
 
         # build button's rect object and center it
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -0,0 +1,165 @@
+"""replay the lag-ratio forecast at past months and score it against what was later claimed
+
+example, from the repository root:
+    python claims_backtest.py claims_data.xlsx --window 6 12 18 --min-history 3 4 --lower 0 0.05 0.1 --upper 0 0.05 0.1
+
+the triangle is built once. at each origin month only the cells known by
+then are kept (departure month + lag <= origin) and every combination of
+the listed settings is forecast from that prefix, origins are spread over
+a process pool. errors are reported per country and per configuration
+"""
+import argparse
+import itertools
+import multiprocessing
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from claims_ingest import load_claims, to_periods
+from claims_forecast import HORIZON, build_triangle, forecast_ratios, output_columns, recent_months, recent_ratios
+
+# settings a configuration is made of
+PARAMETERS = ['window', 'min_history', 'lower', 'upper']
+
+# the full triangle, given to each worker once rather than with every task
+_triangle = None
+
+
+def _share_triangle(triangle):
+    global _triangle
+    _triangle = triangle
+
+
+def prefix(triangle, origin):
+    """the cells already known at the end of month origin, an ordinal"""
+    months = triangle.index.get_level_values(1)
+    lags = triangle.index.get_level_values(2)
+    return triangle[months + lags <= origin]
+
+
+def origins(triangle, horizon=HORIZON):
+    """every month a forecast can be fully scored at: its lags up to horizon - 1 are known"""
+    months = triangle.index.get_level_values(1)
+    last_known = (months + triangle.index.get_level_values(2)).max()
+    return np.arange(months.min() + 1, last_known - horizon + 2)
+
+
+def replay_columns(horizon=HORIZON):
+    """columns of the replays backtest returns"""
+    columns = output_columns(horizon) + PARAMETERS + ["Origin"]
+    for lag in range(1, horizon):
+        columns += [f"Actual_Lag{lag}", f"Error_Lag{lag}"]
+    return columns + ["Actual_Total", "Error_Total"]
+
+
+def replay_origin(task):
+    """forecast every configuration from the prefix at one origin, next to what was realised"""
+    origin, configurations, horizon = task
+    known = prefix(_triangle, origin)
+    forecasts = output_columns(horizon)[4:4 + horizon - 1]
+
+    # each country is forecast for its latest month, whatever the configuration,
+    # so what was eventually claimed for that month is looked up once
+    latest = recent_months(known, window=0).index
+    cells = pd.MultiIndex.from_arrays([latest.get_level_values(0).repeat(horizon),
+                                       latest.get_level_values(1).repeat(horizon),
+                                       np.tile(np.arange(horizon), len(latest))])
+    realised = pd.DataFrame(_triangle.reindex(cells, fill_value=0.0).to_numpy().reshape(-1, horizon),
+                            index=latest.get_level_values(0))
+
+    # the ratios of the longest window are worked out once, each configuration
+    # keeps the months of its own window and only averages them again
+    months_back, dense, ratio_triangle = recent_ratios(
+        known, horizon, max(configuration['window'] for configuration in configurations))
+    replays = []
+    for configuration in configurations:
+        rows = (months_back <= configuration['window']).to_numpy()
+        forecast_df = forecast_ratios(months_back[rows], dense[rows], ratio_triangle[rows], horizon,
+                                      configuration['min_history'], configuration['lower'],
+                                      configuration['upper'])
+        if forecast_df.empty:
+            continue
+        for name, value in configuration.items():
+            forecast_df[name] = value
+        forecast_df['Origin'] = to_periods(np.full(len(forecast_df), origin))
+
+        actual = realised.loc[forecast_df['Country']].to_numpy()
+        for lag in range(1, horizon):
+            forecast_df[f"Actual_Lag{lag}"] = actual[:, lag]
+            forecast_df[f"Error_Lag{lag}"] = forecast_df[forecasts[lag - 1]] - actual[:, lag]
+        forecast_df["Actual_Total"] = actual.sum(axis=1)
+        forecast_df["Error_Total"] = forecast_df["Estimated_Final_Total"] - forecast_df["Actual_Total"]
+        replays.append(forecast_df)
+    return pd.concat(replays, ignore_index=True) if replays else None
+
+
+def backtest(triangle, configurations, horizon=HORIZON, origin_months=None, processes=None):
+    """replay every configuration, a dict of PARAMETERS, at every origin
+
+    returns one row per origin, configuration and country forecast, with the
+    realised lags and the errors of the forecasts
+    """
+    if origin_months is None:
+        origin_months = origins(triangle, horizon)
+    tasks = [(origin, configurations, horizon) for origin in origin_months]
+    with multiprocessing.Pool(processes, initializer=_share_triangle, initargs=(triangle,)) as pool:
+        replays = [replay for replay in pool.imap(replay_origin, tasks) if replay is not None]
+    if not replays:
+        # no origin had a country with enough history
+        return pd.DataFrame(columns=replay_columns(horizon))
+    return pd.concat(replays, ignore_index=True)[replay_columns(horizon)]
+
+
+def summarize(replays, horizon=HORIZON):
+    """error metrics per configuration and country
+
+    MAE and bias (mean error) of each lag forecast and of the estimated
+    total, and the mean absolute percentage error of the total
+    """
+    replays = replays.assign(Abs_Error_Total=replays["Error_Total"].abs(),
+                             APE_Total=(replays["Error_Total"] / replays["Actual_Total"]).abs()
+                             .replace(np.inf, np.nan))
+    metrics = {"Origins": ("Origin", "size")}
+    for lag in range(1, horizon):
+        replays[f"Abs_Error_Lag{lag}"] = replays[f"Error_Lag{lag}"].abs()
+        metrics[f"Lag{lag}_MAE"] = (f"Abs_Error_Lag{lag}", "mean")
+        metrics[f"Lag{lag}_Bias"] = (f"Error_Lag{lag}", "mean")
+    metrics["Total_MAE"] = ("Abs_Error_Total", "mean")
+    metrics["Total_Bias"] = ("Error_Total", "mean")
+    metrics["Total_MAPE"] = ("APE_Total", "mean")
+    return replays.groupby(PARAMETERS + ["Country"]).agg(**metrics).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the claims forecast over past months")
+    parser.add_argument('path', help="claims as xlsx, csv or parquet")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="forecast lags 0 to horizon - 1")
+    parser.add_argument('--window', nargs='+', type=int, default=[12])
+    parser.add_argument('--min-history', nargs='+', type=int, default=[4])
+    parser.add_argument('--lower', nargs='+', type=float, default=[0.05])
+    parser.add_argument('--upper', nargs='+', type=float, default=[0.05])
+    parser.add_argument('--processes', type=int, default=None, help="defaults to every core")
+    parser.add_argument('--out', default='claims_backtest.csv', help="metrics per configuration and country")
+    parser.add_argument('--replays', default=None, help="also write every replayed forecast to this csv")
+    args = parser.parse_args()
+
+    start = perf_counter()
+    triangle = build_triangle(load_claims(args.path), args.horizon)
+    configurations = [dict(zip(PARAMETERS, values)) for values in
+                      itertools.product(args.window, args.min_history, args.lower, args.upper)]
+    replays = backtest(triangle, configurations, args.horizon, processes=args.processes)
+    if args.replays:
+        replays.to_csv(args.replays, index=False)
+    summary = summarize(replays, args.horizon)
+    summary.to_csv(args.out, index=False)
+
+    # one line per configuration, best total error first
+    overall = summary.groupby(PARAMETERS)[["Total_MAE", "Total_MAPE"]].mean().sort_values("Total_MAE")
+    print(overall.to_string())
+    print(f"{len(configurations)} configurations, {replays['Origin'].nunique()} origins "
+          f"in {perf_counter() - start:.1f}s, results in {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""lag-ratio forecast of final claim totals, the steps of Test.py as functions
+
+a triangle is a Series of summed Claim_Amount indexed by
+(Country, Departure_Month ordinal, Lag)
+"""
+import numpy as np
+import pandas as pd
+
+from claims_ingest import to_periods
+
+# lags 0, 1 and 2 unless a longer development window is asked for
+HORIZON = 3
+
+
+def output_columns(horizon=HORIZON):
+    """forecast_df columns for lags 0 to horizon - 1, in file order"""
+    forecasts = [f"Forecast_Lag{lag}_NextMonth" if lag == 1 else f"Forecast_Lag{lag}_MonthPlus{lag}"
+                 for lag in range(1, horizon)]
+    ratios = [f"Lag{lag}_Ratio_Used" for lag in range(horizon)]
+    return ["Country", "Departure_Month", "Current_Lag0_Actual", "Estimated_Final_Total"] + forecasts + ratios
+
+
+def build_triangle(claims, horizon=HORIZON):
+    """sum compact claims from claims_ingest into a triangle of lags 0 to horizon - 1
+
+    only cells with claims are kept, so the triangle grows with the claims
+    recorded and not with countries x months x lags
+    """
+    claims = claims[(claims['Lag'] >= 0) & (claims['Lag'] < horizon)]
+    # summed in float64, a float32 sum drops cents once a cell reaches millions
+    amounts = claims['Claim_Amount'].astype('float64')
+    triangle = amounts.groupby(
+        [claims['Country'], claims['Departure_Month'], claims['Lag']], observed=True
+    ).sum()
+    triangle = triangle[triangle != 0]
+    # plain strings, so triangles built from different files line up
+    triangle.index = triangle.index.set_levels(triangle.index.levels[0].astype(str), level=0)
+    return triangle
+
+
+def winsorized_mean(values, lower=0.05, upper=0.05):
+    """same result as np.mean(winsorize(values, limits=[lower, upper]))
+
+    taken along the last axis, so many series are averaged at once
+    """
+    values = np.ascontiguousarray(values)
+    n = values.shape[-1]
+    ordered = np.sort(values, axis=-1)
+    low = int(lower * n)
+    high = n - int(upper * n)
+    clipped = np.clip(values, ordered[..., low:low + 1], ordered[..., high - 1:high])
+    return clipped.mean(axis=-1)
+
+
+def recent_months(triangle, window=12):
+    """months with a positive total, counted back from each country's latest (0 = latest)
+
+    returns a Series indexed by (Country, Departure_Month) holding only the
+    latest month of each country and the window before it
+    """
+    totals = triangle.groupby(level=[0, 1]).sum()
+    valid = totals[totals > 0]
+    months_back = valid.groupby(level=0).cumcount(ascending=False)
+    return months_back[months_back <= window]
+
+
+def recent_ratios(triangle, horizon=HORIZON, window=12):
+    """lay out the months from recent_months as dense rows of lags 0 to horizon - 1
+
+    returns the months, their summed cells as a (months, lags) array and
+    the cells divided by each month's total
+    """
+    triangle = triangle[triangle.index.get_level_values(2) < horizon]
+    months_back = recent_months(triangle, window)
+
+    # scatter the cells of the recent months into one row per month
+    row = months_back.index.get_indexer(triangle.index.droplevel(2))
+    recent = row >= 0
+    dense = np.zeros((len(months_back), horizon))
+    dense[row[recent], triangle.index.get_level_values(2)[recent]] = triangle.to_numpy()[recent]
+    return months_back, dense, dense / dense.sum(axis=1)[:, np.newaxis]
+
+
+def forecast(triangle, horizon=HORIZON, window=12, min_history=4, lower=0.05, upper=0.05):
+    """forecast the latest month of every country with enough history
+
+    ratios are the winsorized means of the last window months before the
+    latest one, countries with fewer than min_history of those are skipped.
+    only those months are laid out densely, as a (months, lags) array
+    """
+    return forecast_ratios(*recent_ratios(triangle, horizon, window), horizon, min_history, lower, upper)
+
+
+def forecast_ratios(months_back, dense, ratio_triangle, horizon=HORIZON, min_history=4, lower=0.05, upper=0.05):
+    """forecast from the output of recent_ratios
+
+    the rows of a longer window with months_back <= window are the same as
+    recent_ratios gives for that window, so they can be reused for it
+    """
+    months = months_back.index
+
+    # each country has its latest month and history_length months before it
+    history_length = months_back.groupby(level=0).max().to_numpy()
+    eligible = history_length >= min_history
+    row_length = np.repeat(history_length, history_length + 1)
+    months_back = months_back.to_numpy()
+
+    # countries with the same history length are averaged together
+    # as one (countries, lags, months) array
+    lag_ratio = np.empty((eligible.sum(), horizon))
+    for n in np.unique(history_length[eligible]):
+        history_ratio = ratio_triangle[(months_back >= 1) & (row_length == n)].reshape(-1, n, horizon)
+        lag_ratio[history_length[eligible] == n] = winsorized_mean(history_ratio.transpose(0, 2, 1),
+                                                                   lower, upper)
+
+    # normalize ratios
+    lag_ratio /= lag_ratio.sum(axis=1)[:, np.newaxis]
+
+    current = (months_back == 0) & (row_length >= min_history)
+    lag0_actual = dense[current, 0]
+    estimated_total = np.divide(lag0_actual, lag_ratio[:, 0],
+                                out=lag0_actual.copy(), where=lag_ratio[:, 0] > 0)
+
+    columns = output_columns(horizon)
+    data = {
+        "Country": months.get_level_values(0)[current],
+        "Departure_Month": to_periods(months.get_level_values(1)[current]),
+        "Current_Lag0_Actual": lag0_actual,
+        "Estimated_Final_Total": estimated_total,
+    }
+    for lag, name in enumerate(columns[4:4 + horizon - 1], 1):
+        data[name] = estimated_total * lag_ratio[:, lag]
+    for lag in range(horizon):
+        data[f"Lag{lag}_Ratio_Used"] = lag_ratio[:, lag]
+    return pd.DataFrame(data, columns=columns)
+
+
+def affected_countries(triangle, touched, window=12):
+    """countries whose forecast can change after the cells in touched changed
+
+    touched is the index of the changed cells. a country is affected when a
+    touched month is at or after the first month of its history window in
+    the updated triangle
+    """
+    months = recent_months(triangle, window).index.to_frame(index=False)
+    window_start = months.groupby('Country')['Departure_Month'].min()
+
+    touched = touched.droplevel(2).unique().to_frame(index=False)
+    touched['start'] = touched['Country'].map(window_start)
+    # touched countries without a valid month left are affected too, their forecast goes
+    return set(touched.loc[~(touched['Departure_Month'] < touched['start']), 'Country'])
+
+
+def forecast_country(triangle, country, horizon=HORIZON, window=12, min_history=4, lower=0.05, upper=0.05):
+    """forecast one country as a dict of forecast_df's columns, None if it gets no forecast
+
+    triangle must be sorted. Departure_Month is given as 'YYYY-MM'
+    """
+    try:
+        cells = triangle.xs(country, level=0, drop_level=False)
+    except KeyError:
+        return None
+    forecast_df = forecast(cells, horizon, window, min_history, lower, upper)
+    if forecast_df.empty:
+        return None
+    row = forecast_df.iloc[0].to_dict()
+    row['Departure_Month'] = str(row['Departure_Month'])
+    return {name: value if isinstance(value, str) else float(value) for name, value in row.items()}
@@ -0,0 +1,129 @@
+"""load claims once from Excel and reuse a compact parquet copy afterwards
+
+the cached copy is keyed by the checksum of the source file, so a changed
+workbook is converted again and an unchanged one never touches Excel:
+    python claims_ingest.py [claims_data.xlsx]
+
+months are stored as integer period ordinals (the same numbers as
+pd.Period(..., 'M').ordinal) and Lag is the difference of the two
+"""
+import glob
+import hashlib
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Country', 'Departure_Month', 'Claim_Month', 'Claim_Amount']
+CACHE_DIR = '.claims_cache'
+
+
+def checksum(path, chunk_size=1 << 20):
+    """return the sha256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def month_ordinals(values):
+    """convert dates, or anything to_datetime parses, to monthly period ordinals"""
+    dates = pd.to_datetime(values)
+    return ((dates.dt.year - 1970) * 12 + dates.dt.month - 1).to_numpy(np.int32)
+
+
+def to_periods(ordinals):
+    """turn monthly period ordinals back into a PeriodIndex"""
+    return pd.PeriodIndex.from_ordinals(np.asarray(ordinals, dtype=np.int64), freq='M')
+
+
+def read_source(path):
+    """read the needed columns of a claims workbook, csv or parquet file without converting them"""
+    if path.endswith('.csv'):
+        return pd.read_csv(path, usecols=COLUMNS)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=COLUMNS)
+    return pd.read_excel(path, usecols=COLUMNS)
+
+
+def compact(raw, amount_dtype=np.float32):
+    """return claims with compact dtypes and the integer Lag column"""
+    departure = month_ordinals(raw['Departure_Month'])
+    claim = month_ordinals(raw['Claim_Month'])
+    return pd.DataFrame({
+        'Country': raw['Country'].astype('category'),
+        'Departure_Month': departure,
+        'Claim_Month': claim,
+        'Lag': (claim - departure).astype(np.int16),
+        'Claim_Amount': raw['Claim_Amount'].to_numpy(amount_dtype),
+    })
+
+
+def cached_path(path, cache_dir=CACHE_DIR, amount_dtype=np.float32):
+    """return where the compact copy of path's current contents is, or would be, cached"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = np.dtype(amount_dtype).name
+    return os.path.join(cache_dir, f"{stem}-{checksum(path)[:16]}-{suffix}.parquet")
+
+
+def load_claims(path='claims_data.xlsx', cache_dir=CACHE_DIR, amount_dtype=np.float32):
+    """return the compact claims table for path, converting the source only when it changed
+
+    amounts are float32 by default, pass amount_dtype=np.float64 to keep
+    every digit of the source
+    """
+    cache_path = cached_path(path, cache_dir, amount_dtype)
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path)
+
+    claims = compact(read_source(path), amount_dtype)
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary_path = cache_path + '.tmp'
+    claims.to_parquet(temporary_path, index=False)
+    os.replace(temporary_path, cache_path)
+
+    # copies of earlier versions of the same source are never read again
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = np.dtype(amount_dtype).name
+    pattern = glob.escape(stem) + '-' + '[0-9a-f]' * 16 + f'-{suffix}.parquet'
+    for stale_path in glob.glob(os.path.join(glob.escape(cache_dir), pattern)):
+        if stale_path != cache_path:
+            os.remove(stale_path)
+    return claims
+
+
+def iter_claims(path, chunk_rows=1_000_000, cache_dir=CACHE_DIR, amount_dtype=np.float32):
+    """yield the compact claims of path in chunks of at most chunk_rows
+
+    csv and parquet sources are streamed, so memory stays bounded by the
+    chunk size. a workbook cannot be read in parts, it is converted to its
+    cached copy first and that copy is streamed
+    """
+    if path.endswith('.csv'):
+        for raw in pd.read_csv(path, usecols=COLUMNS, chunksize=chunk_rows):
+            yield compact(raw, amount_dtype)
+        return
+
+    import pyarrow.parquet as pq
+
+    if path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=COLUMNS):
+            yield compact(batch.to_pandas(), amount_dtype)
+        return
+
+    cache_path = cached_path(path, cache_dir, amount_dtype)
+    if not os.path.exists(cache_path):
+        load_claims(path, cache_dir, amount_dtype)
+    for batch in pq.ParquetFile(cache_path).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+if __name__ == '__main__':
+    source_path = sys.argv[1] if len(sys.argv) > 1 else 'claims_data.xlsx'
+    start = perf_counter()
+    claims = load_claims(source_path)
+    print(f"{len(claims):,} claims from {source_path} in {perf_counter() - start:.2f}s, "
+          f"{claims.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory")
@@ -0,0 +1,102 @@
+"""forecast claims extracts too large for memory, one country partition per process
+
+example, from the repository root:
+    python claims_parallel.py claims_extract.csv --chunk-rows 1000000 --partitions 32 --out claims_forecast_output.xlsx
+
+claims are streamed in chunks and each chunk is summed into triangle cells
+right away, then spilled to disk split by country. every partition holds
+whole countries, so each one is merged and forecast on its own in a
+process pool and the results are concatenated in Country order
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import zlib
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from claims_ingest import iter_claims
+from claims_forecast import HORIZON, build_triangle, forecast, output_columns
+
+
+def partition_of(countries, partitions):
+    """stable partition number for each country, the same in every chunk and run"""
+    return np.array([zlib.crc32(country.encode()) % partitions for country in countries])
+
+
+def spill_chunks(path, spill_dir, partitions, horizon=HORIZON, chunk_rows=1_000_000):
+    """sum each chunk of claims into cells and write them to their partition's directory"""
+    for partition in range(partitions):
+        os.makedirs(os.path.join(spill_dir, str(partition)), exist_ok=True)
+    for number, claims in enumerate(iter_claims(path, chunk_rows)):
+        cells = build_triangle(claims, horizon).to_frame('Claim_Amount')
+        countries = cells.index.levels[0]
+        partition = partition_of(countries, partitions)[cells.index.codes[0]]
+        for part in np.unique(partition):
+            cells[partition == part].to_parquet(os.path.join(spill_dir, str(part), f"{number}.parquet"))
+
+
+def forecast_partition(task):
+    """merge the spilled cells of one partition and forecast its countries"""
+    partition_dir, parameters = task
+    parts = [pd.read_parquet(os.path.join(partition_dir, name))['Claim_Amount']
+             for name in sorted(os.listdir(partition_dir))]
+    if not parts:
+        return None
+    # the same cell can come from several chunks
+    triangle = pd.concat(parts).groupby(level=[0, 1, 2]).sum()
+    return forecast(triangle, **parameters)
+
+
+def forecast_partitioned(path, horizon=HORIZON, window=12, min_history=4, lower=0.05, upper=0.05,
+                         chunk_rows=1_000_000, partitions=None, processes=None, spill_dir=None):
+    """forecast_df for the claims in path, reading at most chunk_rows claims at a time"""
+    partitions = partitions or 4 * (processes or os.cpu_count())
+    parameters = {'horizon': horizon, 'window': window, 'min_history': min_history,
+                  'lower': lower, 'upper': upper}
+    with tempfile.TemporaryDirectory(dir=spill_dir) as spill_path:
+        spill_chunks(path, spill_path, partitions, horizon, chunk_rows)
+        tasks = [(os.path.join(spill_path, str(partition)), parameters) for partition in range(partitions)]
+        with multiprocessing.Pool(processes) as pool:
+            results = [result for result in pool.imap_unordered(forecast_partition, tasks) if result is not None]
+    if not results:
+        return pd.DataFrame(columns=output_columns(horizon))
+    return pd.concat(results).sort_values('Country', ignore_index=True)
+
+
+def write_forecast(forecast_df, path):
+    """write forecast_df as xlsx, parquet or csv depending on the extension"""
+    if path.endswith('.parquet'):
+        forecast_df.to_parquet(path, index=False)
+    elif path.endswith('.csv'):
+        forecast_df.to_csv(path, index=False)
+    else:
+        forecast_df.to_excel(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast a large claims extract in country partitions")
+    parser.add_argument('path', help="claims as csv, parquet or xlsx")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="forecast lags 0 to horizon - 1")
+    parser.add_argument('--window', type=int, default=12, help="months of history per forecast")
+    parser.add_argument('--min-history', type=int, default=4)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="claims read at a time")
+    parser.add_argument('--partitions', type=int, default=None, help="defaults to 4 per process")
+    parser.add_argument('--processes', type=int, default=None, help="defaults to every core")
+    parser.add_argument('--spill-dir', default=None, help="where partitions are spilled, defaults to the temp dir")
+    parser.add_argument('--out', default='claims_forecast_output.xlsx')
+    args = parser.parse_args()
+
+    start = perf_counter()
+    forecast_df = forecast_partitioned(args.path, args.horizon, args.window, args.min_history,
+                                       chunk_rows=args.chunk_rows, partitions=args.partitions,
+                                       processes=args.processes, spill_dir=args.spill_dir)
+    write_forecast(forecast_df, args.out)
+    print(f"{len(forecast_df)} countries forecast in {perf_counter() - start:.1f}s, results in {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""serve per-country claims forecasts over local HTTP/JSON
+
+example, from the repository root:
+    python claims_service.py --source claims_data.xlsx --port 8765
+
+    GET  /forecast/<country>            forecast with the store's settings
+    GET  /forecast/<country>?window=6   any of window, min_history, lower, upper may be overridden
+    GET  /countries                     countries with claims
+    GET  /stats                         cache hits, misses and size
+    POST /ingest {"path": "new_claims.xlsx"}
+                                        add a batch of claims, forgetting cached forecasts
+                                        it can change
+
+the triangle stays in memory and forecasts are kept in an LRU cache per
+country and settings, so repeated queries never touch the disk
+"""
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from claims_forecast import HORIZON, forecast_country
+from triangle_store import TriangleStore
+
+# query parameters a request may override, and how to read them
+OVERRIDES = {'window': int, 'min_history': int, 'lower': float, 'upper': float}
+
+
+def check_parameters(parameters):
+    """raise ValueError unless the forecast settings can give a forecast
+
+    each winsorizing limit cuts less than half the months, so the limits
+    never cross
+    """
+    if parameters['window'] < 1 or parameters['min_history'] < 1:
+        raise ValueError("window and min_history must be at least 1")
+    if not (0 <= parameters['lower'] < 0.5 and 0 <= parameters['upper'] < 0.5):
+        raise ValueError("lower and upper must be at least 0 and below 0.5")
+
+
+class ForecastService:
+    """a TriangleStore kept in memory with an LRU cache of per-country forecasts"""
+
+    def __init__(self, store, cache_size=1024):
+        """serve the forecasts of an opened store"""
+        self.store = store
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # batches are added one at a time, queries carry on meanwhile
+        self.ingest_lock = threading.Lock()
+        self.triangle = store.triangle.sort_index()
+
+    def forecast(self, country, **overrides):
+        """return the forecast of one country as a dict, None if it gets none
+
+        raises ValueError for overrides check_parameters rejects
+        """
+        parameters = dict(self.store.parameters, **overrides)
+        check_parameters(parameters)
+        key = (country,) + tuple(sorted(parameters.items()))
+        with self.lock:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            self.misses += 1
+            triangle = self.triangle
+
+        result = forecast_country(triangle, country, **parameters)
+        with self.lock:
+            # a batch ingested meanwhile may have made the result stale
+            if triangle is self.triangle:
+                self.cache[key] = result
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return result
+
+    def countries(self):
+        """every country with claims in the triangle"""
+        return self.triangle.index.unique(level=0).tolist()
+
+    def ingest(self, path):
+        """add a batch of claims to the store and forget the cached forecasts it can change
+
+        returns the countries whose stored forecast was recomputed
+        """
+        with self.ingest_lock:
+            affected = self.store.ingest(path)
+            triangle = self.store.triangle.sort_index()
+            # affected is worked out for the store's window, a longer window
+            # reaches further back, so forecasts cached for one are dropped too
+            window = self.store.parameters['window']
+            with self.lock:
+                self.triangle = triangle
+                for key in [key for key in self.cache if key[0] in affected or dict(key[1:])['window'] > window]:
+                    del self.cache[key]
+        return affected
+
+    def stats(self):
+        """cache hits, misses and size"""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'cached': len(self.cache),
+                    'capacity': self.cache_size}
+
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    """JSON endpoints of a ForecastService, set as the server's service attribute"""
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        if url.path.startswith('/forecast/'):
+            country = unquote(url.path[len('/forecast/'):])
+            try:
+                overrides = {name: OVERRIDES[name](values[-1]) for name, values in parse_qs(url.query).items()}
+            except (KeyError, ValueError):
+                self._send(400, {'error': f"query parameters can be {', '.join(OVERRIDES)}"})
+                return
+            try:
+                result = service.forecast(country, **overrides)
+            except ValueError as error:
+                self._send(400, {'error': str(error)})
+                return
+            if result is None:
+                self._send(404, {'error': f"no forecast for {country}"})
+            else:
+                self._send(200, result)
+        elif url.path == '/countries':
+            self._send(200, service.countries())
+        elif url.path == '/stats':
+            self._send(200, service.stats())
+        else:
+            self._send(404, {'error': f"unknown path {url.path}"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/ingest':
+            self._send(404, {'error': f"unknown path {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            affected = self.server.service.ingest(request['path'])
+        except (ValueError, KeyError, TypeError) as error:
+            self._send(400, {'error': f"expected {{\"path\": ...}}: {error}"})
+            return
+        except OSError as error:
+            self._send(400, {'error': str(error)})
+            return
+        self._send(200, {'affected': sorted(affected)})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(service, host='127.0.0.1', port=8765, verbose=False):
+    """answer requests until interrupted"""
+    server = ThreadingHTTPServer((host, port), ForecastHandler)
+    server.service = service
+    server.verbose = verbose
+    print(f"serving forecasts on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve claims forecasts over HTTP")
+    parser.add_argument('--store', default='claims_triangle', help="TriangleStore path, as used by Test.py")
+    parser.add_argument('--source', default=None, help="rebuild the store from this full history if it changed")
+    parser.add_argument('--horizon', type=int, default=HORIZON)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-size', type=int, default=1024, help="forecasts kept in memory")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    store = TriangleStore(args.store, horizon=args.horizon)
+    if args.source:
+        store.rebuild(args.source)
+    if store.triangle is None:
+        parser.error(f"{args.store} holds no triangle yet, pass --source")
+    serve(ForecastService(store, args.cache_size), args.host, args.port, args.verbose)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""generate synthetic claims extracts shaped like claims_data.xlsx
+
+example, from the repository root:
+    python claims_synthetic.py claims_data.xlsx --rows 50000
+    python claims_synthetic.py claims_extract.parquet --rows 200000000 --countries 5000 --skew 1.3
+
+claims are spread over countries with Zipf weights (skew 0 gives every
+country the same share), some countries start late so their history is
+short, and lags follow a geometric profile (a lag-decay near 1 gives long
+tails). the extract is cut at its last month like a real one, so recent
+departure months only have their early lags. rows are generated and
+written a chunk at a time, csv and parquet need no more memory than a chunk
+"""
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from claims_ingest import COLUMNS
+
+# the most rows a worksheet holds, less the header
+EXCEL_ROWS = 1_048_575
+
+
+def lag_profile(max_lag=6, lag_decay=0.5):
+    """probability of each lag 0 to max_lag, falling geometrically"""
+    weights = lag_decay ** np.arange(max_lag + 1)
+    return weights / weights.sum()
+
+
+def generate(rows, countries=200, months=36, start='2022-01', skew=1.1, late_share=0.1,
+             max_lag=6, lag_decay=0.5, amount_mean=6.5, amount_sigma=1.0, seed=0, chunk_rows=1_000_000):
+    """yield DataFrames of claims with the claims_data.xlsx columns, rows in total"""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"C{number:0{len(str(countries))}d}" for number in range(countries)])
+    weights = 1.0 / np.arange(1, countries + 1) ** skew
+    weights /= weights.sum()
+    # most countries report from the first month, late_share of them start at a random later one
+    first_month = np.where(rng.random(countries) < late_share, rng.integers(0, months, countries), 0)
+    profile = lag_profile(max_lag, lag_decay)
+    first_day = np.datetime64(start, 'M')
+
+    produced = 0
+    while produced < rows:
+        # claims after the extract's last month have not happened yet and are dropped
+        size = min(chunk_rows, rows - produced)
+        country = rng.choice(countries, size, p=weights)
+        departure = first_month[country] + (rng.random(size) * (months - first_month[country])).astype(np.int64)
+        claim = departure + rng.choice(max_lag + 1, size, p=profile)
+        keep = claim < months
+        keep[np.flatnonzero(keep)[rows - produced:]] = False
+        produced += int(keep.sum())
+        yield pd.DataFrame({
+            'Country': names[country[keep]],
+            'Departure_Month': (first_day + departure[keep]).astype('datetime64[ns]'),
+            'Claim_Month': (first_day + claim[keep]).astype('datetime64[ns]'),
+            'Claim_Amount': rng.lognormal(amount_mean, amount_sigma, int(keep.sum())).round(2),
+        }, columns=COLUMNS)
+
+
+def write(path, rows, **options):
+    """generate rows claims into a csv, parquet or xlsx file"""
+    chunks = generate(rows, **options)
+    if path.endswith('.csv'):
+        for number, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if number == 0 else 'a', header=number == 0, index=False)
+    elif path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        writer.close()
+    else:
+        if rows > EXCEL_ROWS:
+            raise ValueError(f"a worksheet holds at most {EXCEL_ROWS:,} claims, write csv or parquet instead")
+        pd.concat(chunks, ignore_index=True).to_excel(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic claims extract")
+    parser.add_argument('path', help="output .xlsx, .csv or .parquet")
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--countries', type=int, default=200)
+    parser.add_argument('--months', type=int, default=36, help="departure months in the extract")
+    parser.add_argument('--start', default='2022-01', help="first departure month, YYYY-MM")
+    parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent of country sizes")
+    parser.add_argument('--late-share', type=float, default=0.1, help="share of countries starting late")
+    parser.add_argument('--max-lag', type=int, default=6)
+    parser.add_argument('--lag-decay', type=float, default=0.5, help="ratio between successive lag shares")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    write(args.path, args.rows, countries=args.countries, months=args.months, start=args.start,
+          skew=args.skew, late_share=args.late_share, max_lag=args.max_lag, lag_decay=args.lag_decay,
+          seed=args.seed, chunk_rows=args.chunk_rows)
+    print(f"{args.rows:,} claims written to {args.path} in {perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
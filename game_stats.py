@@ -5,8 +5,9 @@ class GameStats:
         self.settings = ai_game.settings
         self.reset_stats()
 
-        # high score should never be reset
-        self.high_score = 0
+        # high score should never be reset, it starts from the saved leaderboard
+        high_scores = ai_game.high_scores
+        self.high_score = high_scores.best() if high_scores else 0
 
 
     def reset_stats(self):
@@ -0,0 +1,152 @@
+import glob
+import heapq
+import os
+import queue
+import struct
+import threading
+import time
+
+# one finished game: when it ended, score, level reached and the player's name
+RECORD = struct.Struct('<dqHB')
+# snapshot header: magic, generation of the log to read next, games recorded
+SNAPSHOT_HEADER = struct.Struct('<4sIQ')
+SNAPSHOT_MAGIC = b'AIHS'
+
+
+def encode(entry):
+    """pack a (score, level, ended, player) entry"""
+    score, level, ended, player = entry
+    # at most 255 bytes, cut on a character boundary
+    name = player.encode()[:255].decode(errors='ignore').encode()
+    return RECORD.pack(ended, score, level, len(name)) + name
+
+
+def decode_all(data, offset=0):
+    """yield entries from packed records, stopping at a torn record at the end"""
+    while offset + RECORD.size <= len(data):
+        ended, score, level, name_length = RECORD.unpack_from(data, offset)
+        end = offset + RECORD.size + name_length
+        if end > len(data):
+            break
+        yield score, level, ended, data[offset + RECORD.size:end].decode(errors='replace')
+        offset = end
+
+
+class HighScoreStore:
+    """leaderboard kept in memory and persisted to an append-only log
+
+    results are queued by the game and written in batches by a background
+    thread, so nothing in the frame loop waits on the disk. on startup the
+    log is folded into a small snapshot holding the leaderboard, so startup
+    time does not grow with the number of games ever recorded
+    """
+
+    def __init__(self, path, size=10, batch_size=256, flush_interval=1.0):
+        """compact what is on disk and start the writer thread
+
+        files are named after path, its directory is created if needed
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.size = size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.games = 0
+        self.leaderboard = []
+        self.generation = 0
+        self._compact()
+
+        self.pending = queue.Queue()
+        self.log = open(self._log_path(self.generation), 'ab')
+        self.writer = threading.Thread(target=self._write_batches, name="high-score-writer", daemon=True)
+        self.writer.start()
+
+    def _log_path(self, generation):
+        return f"{self.path}.{generation}"
+
+    def _compact(self):
+        """fold the current log into a new snapshot, crash-safe at every step
+
+        the snapshot is replaced atomically and names the next log
+        generation, so a crash before the old log is deleted never counts
+        its games twice
+        """
+        snapshot_path = self.path + '.snapshot'
+        entries = []
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'rb') as snapshot:
+                data = snapshot.read()
+            magic, self.generation, self.games = SNAPSHOT_HEADER.unpack_from(data)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{snapshot_path} is not a high score snapshot")
+            entries.extend(decode_all(data, SNAPSHOT_HEADER.size))
+
+        log_path = self._log_path(self.generation)
+        if os.path.exists(log_path):
+            with open(log_path, 'rb') as log:
+                logged = list(decode_all(log.read()))
+            self.games += len(logged)
+            entries.extend(logged)
+        self.leaderboard = heapq.nlargest(self.size, entries)
+
+        self.generation += 1
+        temporary_path = snapshot_path + '.tmp'
+        with open(temporary_path, 'wb') as snapshot:
+            snapshot.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.generation, self.games))
+            snapshot.write(b''.join(encode(entry) for entry in self.leaderboard))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, snapshot_path)
+
+        # logs from earlier generations are now part of the snapshot
+        for stale_path in glob.glob(glob.escape(self.path) + '.*'):
+            suffix = stale_path[len(self.path) + 1:]
+            if suffix.isdigit() and int(suffix) < self.generation:
+                os.remove(stale_path)
+
+    def best(self):
+        """return the highest score recorded, or 0"""
+        return self.leaderboard[0][0] if self.leaderboard else 0
+
+    def submit(self, player, score, level):
+        """record a finished game without touching the disk"""
+        entry = (score, level, time.time(), player)
+        self.games += 1
+        if len(self.leaderboard) < self.size or entry > self.leaderboard[-1]:
+            self.leaderboard = heapq.nlargest(self.size, self.leaderboard + [entry])
+        self.pending.put(entry)
+
+    def _write_batches(self):
+        """writer thread: append queued games to the log in batches"""
+        while True:
+            entry = self.pending.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self.pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._append(batch)
+                    return
+                batch.append(entry)
+            self._append(batch)
+
+    def _append(self, batch):
+        """write a batch of games to the log in one call"""
+        self.log.write(b''.join(encode(entry) for entry in batch))
+        self.log.flush()
+        os.fsync(self.log.fileno())
+
+    def close(self):
+        """write everything still queued and stop the writer thread"""
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+        self.log.close()
@@ -0,0 +1,34 @@
+import pygame
+
+
+class GlyphText:
+    """renders short strings by blitting cached glyphs instead of calling font.render"""
+
+    def __init__(self, font, text_color, bg_color):
+        """initialize an empty glyph cache for one font and color pair"""
+        self.font = font
+        self.text_color = text_color
+        self.bg_color = bg_color
+        self.glyphs = {}
+        self.height = font.get_height()
+
+    def glyph(self, char):
+        """return the rendered image of one character, rendering it on first use"""
+        image = self.glyphs.get(char)
+        if image is None:
+            image = self.font.render(char, True, self.text_color, self.bg_color)
+            self.glyphs[char] = image
+            self.height = max(self.height, image.get_height())
+        return image
+
+    def render(self, text):
+        """compose text from cached glyphs into a new image"""
+        glyphs = [self.glyph(char) for char in text]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        image = pygame.Surface((width, self.height))
+        image.fill(self.bg_color)
+        x = 0
+        for glyph in glyphs:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return image
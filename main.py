@@ -1,5 +1,9 @@
+import argparse
 import sys
-from time import sleep
+from time import perf_counter
+
+# startup is timed from here, before pygame is imported
+STARTED_AT = perf_counter()
 
 import pygame
 
@@ -10,19 +14,42 @@ from button import Button
 from ship import Ship
 from bullet import Bullet
 from alien import Alien
+from asset_cache import assets
+from array_fleet import ArrayFleet
+from spatial_hash import SpatialHash
+from renderer import Renderer
+from pool import Pool
+from profiler import FrameProfiler
+from high_scores import HighScoreStore
+import replay
+from snapshot import SnapshotRing
 
 
 class AlienInvation:
     """class to manage game assets and behavior"""
 
-    def __init__(self):
-        pygame.init()
+    def __init__(self, headless=False, settings=None):
+        """initialize the game, headless runs without any display"""
+        self.headless = headless
         self.clock = pygame.time.Clock()
-        self.settings = Settings()
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        self.settings.screen_width = self.screen.get_rect().width
-        self.settings.screen_height = self.screen.get_rect().height
-        pygame.display.set_caption("Alien Invasion")
+        self.settings = settings or Settings()
+        # only the modules the game uses are initialized, not every pygame module
+        pygame.font.init()
+        if headless:
+            # draw off-screen at the configured size
+            self.screen = pygame.Surface((self.settings.screen_width, self.settings.screen_height))
+        else:
+            pygame.display.init()
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            self.settings.screen_width = self.screen.get_rect().width
+            self.settings.screen_height = self.screen.get_rect().height
+            pygame.display.set_caption("Alien Invasion")
+        assets.load_bundle(self.settings.asset_bundle)
+
+        # saved leaderboard, headless games never touch it
+        self.high_scores = None
+        if self.settings.high_score_path and not headless:
+            self.high_scores = HighScoreStore(self.settings.high_score_path, self.settings.leaderboard_size)
 
         # create an instance to store game staistics and create scoreboard
         self.stats = GameStats(self)
@@ -30,26 +57,122 @@ class AlienInvation:
 
         self.ship = Ship(self)
         self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        self.bullet_pool = Pool(lambda: Bullet(self))
+        self.alien_pool = Pool(lambda: Alien(self))
+        if self.settings.array_fleet:
+            self.aliens = ArrayFleet(self)
+        else:
+            self.aliens = pygame.sprite.Group()
+        self.alien_grid = SpatialHash(self.settings.collision_cell_size)
 
         self._create_fleet()
 
         # start game in inactive state
         self.game_active = False
+        # ticks simulated so far, and ticks left before the game resumes after the ship is hit
+        self.ticks = 0
+        self.pause_ticks = 0
 
         # make the play button
         self.play_button = Button(self, 'Play')
 
+        # draws frames in full or as dirty rectangles
+        self.renderer = Renderer(self)
+
+        # frame profiler, None unless profiling is turned on
+        self.profiler = None
+        if self.settings.profiling:
+            self.profiler = FrameProfiler(self, self.settings.profile_frames)
+
+        # recent snapshots to rewind through, None unless rewind is turned on
+        self.rewind = None
+        if self.settings.rewind_seconds:
+            capacity = self.settings.rewind_seconds * self.settings.ticks_per_second // self.settings.rewind_interval
+            self.rewind = SnapshotRing(capacity)
+
+        # seconds from startup to the first frame, set once run_game draws it
+        self.time_to_first_frame = None
+
+        # input recorder, None unless recording is turned on
+        self.recorder = None
+        if self.settings.record_path:
+            self.recorder = replay.InputRecorder(self, self.settings.record_path)
+
     def run_game(self):
-        """starts the loop for game"""
-        while True:
-            self._check_events()
-            if self.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-            self._update_screen()
-            self.clock.tick(60)
+        """starts the loop for game
+
+        the simulation advances in fixed ticks while frames are drawn as
+        often as the display allows, in between the last two ticks
+        """
+        tick_length = 1 / self.settings.ticks_per_second
+        accumulator = 0.0
+        # draw the first frame before the loop so startup time can be reported
+        self._update_screen()
+        self.time_to_first_frame = perf_counter() - STARTED_AT
+        if self.settings.report_startup:
+            print(f"first frame after {self.time_to_first_frame * 1000:.0f} ms")
+            print(assets.report())
+
+        previous = perf_counter()
+        try:
+            while True:
+                now = perf_counter()
+                # after a long stall drop the lost time rather than racing to catch up
+                accumulator += min(now - previous, 0.25)
+                previous = now
+
+                self._check_events()
+                while accumulator >= tick_length:
+                    self._tick()
+                    accumulator -= tick_length
+
+                alpha = accumulator / tick_length if self.settings.interpolate else 1.0
+                self._update_screen(alpha)
+                self.clock.tick(self.settings.max_fps)
+        finally:
+            if self.high_scores:
+                self.high_scores.close()
+            if self.recorder:
+                self.recorder.close()
+            if self.profiler:
+                self.profiler.export_chrome_trace(self.settings.profile_trace_path)
+            if self.settings.report_startup:
+                self._report_pools()
+
+    def _report_pools(self):
+        """print how often the bullet and alien pools were reused"""
+        for name, pool in (('bullet', self.bullet_pool), ('alien', self.alien_pool)):
+            stats = pool.stats()
+            print(f"{name} pool: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['in_use']} in use, {stats['free']} free, high-water {stats['high_water']}")
+
+    def _tick(self):
+        """advance the simulation by one fixed timestep"""
+        self.ticks += 1
+        if self.rewind is not None and self.game_active and self.ticks % self.settings.rewind_interval == 0:
+            self.rewind.push(self)
+        if self.pause_ticks:
+            self.pause_ticks -= 1
+        elif self.game_active:
+            self.ship.update()
+            self._update_bullets()
+            self._update_aliens()
+
+    def step(self, actions=()):
+        """advance the game by one tick as fast as possible, without drawing
+
+        actions is a collection of 'left', 'right', 'fire' and 'play'
+        returns whether the game is still active
+        """
+        if 'play' in actions and not self.game_active:
+            self._start_game()
+        self.ship.moving_left = 'left' in actions
+        self.ship.moving_right = 'right' in actions
+        if 'fire' in actions:
+            self._fire_bullet()
+
+        self._tick()
+        return self.game_active
 
     def _check_events(self):
         """responds to keys press and mouse events"""
@@ -60,12 +183,16 @@ class AlienInvation:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.renderer.needs_full = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse. get_pos()
                 self._check_play_button(mouse_pos)
 
     def _check_keydown_events(self, event):
         """responds to key presses"""
+        if self.recorder:
+            self.recorder.record(replay.KEYDOWN, event.key)
         if event.key == pygame.K_RIGHT:
             self.ship.moving_right = True
         elif event.key == pygame.K_LEFT:
@@ -74,9 +201,14 @@ class AlienInvation:
             sys.exit()
         elif event.key == pygame.K_SPACE:
             self._fire_bullet()
+        elif event.key == pygame.K_BACKSPACE and self.rewind is not None:
+            # go back about one second
+            self.rewind.rewind(self, self.settings.ticks_per_second // self.settings.rewind_interval)
 
     def _check_keyup_events(self, event):
         """responds to key releases"""
+        if self.recorder:
+            self.recorder.record(replay.KEYUP, event.key)
         if event.key == pygame.K_RIGHT:
             self.ship.moving_right = False
         if event.key == pygame.K_LEFT:
@@ -84,55 +216,92 @@ class AlienInvation:
 
     def _check_play_button(self, mouse_pos):
         """start new game when player clicks play"""
+        if self.recorder:
+            self.recorder.record(replay.CLICK, *mouse_pos)
         button_clicked = self.play_button.rect.collidepoint(mouse_pos)
         if button_clicked and not self.game_active:
-            # reset the game settings
-            self.settings.initialize_dynamic_settings()
-            # reset game statistics
-            self.stats.reset_stats()
-            self.sb.prep_score()
-            self.sb.prep_level()
-            self.sb.prep_ships()
-            self.game_active = True
-
-            # get rid of any remaining bullets and aliens
-            self.bullets.empty()
-            self.aliens.empty()
-
-            # create new fleet and center the ship
-            self._create_fleet()
-            self.ship.center_ship()
+            self._start_game()
+
+    def _start_game(self):
+        """reset settings and statistics and start a new game"""
+        # reset the game settings
+        self.settings.initialize_dynamic_settings()
+        # reset game statistics
+        self.stats.reset_stats()
+        self.sb.prep_score()
+        self.sb.prep_level()
+        self.sb.prep_ships()
+        self.game_active = True
+
+        # get rid of any remaining bullets and aliens
+        self._empty_bullets()
+        self._empty_aliens()
+
+        # create new fleet and center the ship
+        self._create_fleet()
+        self.ship.center_ship()
 
-            # hide mouse cursor
+        # hide mouse cursor
+        if not self.headless:
             pygame.mouse.set_visible(False)
 
     def _fire_bullet(self):
-        """create bullet and add to bullets group"""
+        """create bullet and add to bullets group
+
+        shots during the pause after the ship is hit are dropped, not fired
+        on the first tick after it
+        """
+        if self.pause_ticks:
+            return
         if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
+            new_bullet = self.bullet_pool.acquire()
+            new_bullet.reset()
             self.bullets.add(new_bullet)
 
+    def _empty_bullets(self):
+        """remove every bullet and return them to the pool"""
+        for bullet in self.bullets.spritedict:
+            self.bullet_pool.release(bullet)
+        self.bullets.empty()
+
+    def _empty_aliens(self):
+        """remove every alien and return sprite aliens to the pool"""
+        if not self.settings.array_fleet:
+            for alien in self.aliens.spritedict:
+                self.alien_pool.release(alien)
+        self.aliens.empty()
+
     def _update_bullets(self):
         """updates position of bullet and gets rid of old bullet"""
         self.bullets.update()
-        # get rid of bullets above screen
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+        # get rid of bullets above screen without copying the group
+        expired = [bullet for bullet in self.bullets.spritedict if bullet.rect.bottom <= 0]
+        for bullet in expired:
+            self.bullets.remove(bullet)
+            self.bullet_pool.release(bullet)
         self._check_bullet_alien_collision()
 
     def _check_bullet_alien_collision(self):
         """responds to bullet-alien collision"""
         # check if bullet has hit any alien, if so then remove both bullet and alien
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+        if self.settings.array_fleet:
+            collisions = self.aliens.groupcollide(self.bullets, True, True)
+        elif self._use_grid():
+            collisions = self.alien_grid.groupcollide(self.bullets, True, True)
+        else:
+            collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
         if collisions:
-            for aliens in collisions.values():
+            for bullet, aliens in collisions.items():
                 self.stats.score += self.settings.alien_points * len(aliens)
+                self.bullet_pool.release(bullet)
+                if not self.settings.array_fleet:
+                    for alien in aliens:
+                        self.alien_pool.release(alien)
             self.sb.prep_score()
             self.sb.check_high_score()
         if not self.aliens:
             # destroy existing bullet and create new fleet
-            self.bullets.empty()
+            self._empty_bullets()
             self._create_fleet()
             self.settings.increase_speed()
 
@@ -140,19 +309,37 @@ class AlienInvation:
             self.stats.level += 1
             self.sb.prep_level()
 
+    def _use_grid(self):
+        """check collisions through the spatial hash only while the fleet is large
+
+        a fleet only shrinks until it is built again, so once pair checks
+        take over the grid is not queried again before its next rebuild
+        """
+        return self.settings.spatial_hash and len(self.aliens) >= self.settings.spatial_hash_min_aliens
+
     def _update_aliens(self):
         """ckeck if fleet is at edge and update position"""
         self._check_fleet_edges()
         self.aliens.update()
 
         # look for alien-ship collision
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.settings.array_fleet:
+            ship_collided = self.aliens.collideany(self.ship)
+        elif self._use_grid():
+            ship_collided = self.alien_grid.collideany(self.ship)
+        else:
+            ship_collided = pygame.sprite.spritecollideany(self.ship, self.aliens)
+        if ship_collided:
             self._ship_hit()
         # for alien hitting the bottom of the screen
         self._check_aliens_bottom()
 
     def _check_fleet_edges(self):
         """responds if aliens have hit the edge"""
+        if self.settings.array_fleet:
+            if self.aliens.check_edges():
+                self._change_fleet_direction()
+            return
         for alien in self.aliens.sprites():
             if alien.check_edges():
                 self._change_fleet_direction()
@@ -160,16 +347,22 @@ class AlienInvation:
 
     def _change_fleet_direction(self):
         """drop entire fleet and change direction"""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        if self.settings.array_fleet:
+            self.aliens.drop(self.settings.fleet_drop_speed)
+        else:
+            for alien in self.aliens.sprites():
+                alien.rect.y += self.settings.fleet_drop_speed
         self.settings.fleet_direction *= -1
 
     def _create_fleet(self):
         """create fleet of aliens"""
+        if self.settings.array_fleet:
+            self.aliens.create_fleet()
+            return
+
         # create an alien and add till no space is left
         # spacing between alien is 1 alien width and 1 alien height
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
+        alien_width, alien_height = assets.image(Alien.image_path).get_size()
 
         current_x, current_y = alien_width, alien_height
         while current_y < (self.settings.screen_height - 3 * alien_height):
@@ -181,12 +374,13 @@ class AlienInvation:
             current_x = alien_width
             current_y += 2 * alien_height
 
+        if self.settings.spatial_hash:
+            self.alien_grid.rebuild(self.aliens)
+
     def _create_alien(self, x_position, y_position):
         """create an alien and place it in a fleet"""
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        new_alien.rect.x = x_position
-        new_alien.rect.y = y_position
+        new_alien = self.alien_pool.acquire()
+        new_alien.place(x_position, y_position)
         self.aliens.add(new_alien)
 
     def _ship_hit(self):
@@ -197,43 +391,50 @@ class AlienInvation:
             self.sb.prep_ships()
 
             # get rid of any remaining bullets and aliens
-            self.bullets.empty()
-            self.aliens.empty()
+            self._empty_bullets()
+            self._empty_aliens()
 
             # create new fleet and center the ship
             self._create_fleet()
             self.ship.center_ship()
 
-            # pause
-            sleep(0.5)
-        else:
+            # pause without blocking the loop, counted in simulation ticks
+            self.pause_ticks = round(self.settings.ship_hit_pause * self.settings.ticks_per_second)
+        elif self.game_active:
             self.game_active = False
-            pygame.mouse.set_visible(True)
+            if self.high_scores:
+                self.high_scores.submit(self.settings.player_name, self.stats.score, self.stats.level)
+            if not self.headless:
+                pygame.mouse.set_visible(True)
 
     def _check_aliens_bottom(self):
         """check if any aliens have reached the bottom of the screen"""
+        if self.settings.array_fleet:
+            if self.aliens.check_bottom():
+                self._ship_hit()
+            return
         for alien in self.aliens.sprites():
             if alien.rect.bottom >= self.settings.screen_height:
                 self._ship_hit()
                 break
 
-    def _update_screen(self):
-        self.screen.fill(self.settings.bg_color)
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-        self.ship.blitme()
-        self.aliens.draw(self.screen)
-
-        # draw score info
-        self.sb.show_score()
-
-        # draw play button if game is inactive
-        if not self.game_active:
-            self.play_button.draw_button()
-
-        pygame.display.flip()
+    def _update_screen(self, alpha=1.0):
+        """draw the frame, the renderer pushes only what changed when it can"""
+        self.renderer.draw(alpha)
 
 
 if __name__ == '__main__':
-    ai = AlienInvation()
+    parser = argparse.ArgumentParser(description="Alien Invasion")
+    parser.add_argument('--profile', action='store_true', help="show frame timings and write a trace")
+    parser.add_argument('--record', metavar='PATH', help="record input for replay.py")
+    parser.add_argument('--report-startup', action='store_true', help="print time to the first frame and pool use at exit")
+    parser.add_argument('--player', default=Settings().player_name, help="name saved with high scores")
+    args = parser.parse_args()
+
+    settings = Settings()
+    settings.profiling = args.profile
+    settings.record_path = args.record
+    settings.report_startup = args.report_startup
+    settings.player_name = args.player
+    ai = AlienInvation(settings=settings)
     ai.run_game()
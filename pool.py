@@ -0,0 +1,41 @@
+class Pool:
+    """keeps released objects so they are reused instead of reallocated"""
+
+    def __init__(self, factory):
+        """initialize an empty pool that builds new objects with factory()"""
+        self.factory = factory
+        self.free = []
+
+        # statistics for monitoring
+        self.hits = 0
+        self.misses = 0
+        self.in_use = 0
+        self.high_water = 0
+
+    def acquire(self):
+        """return a released object, or a new one if none are free"""
+        if self.free:
+            obj = self.free.pop()
+            self.hits += 1
+        else:
+            obj = self.factory()
+            self.misses += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj):
+        """hand an object back for reuse"""
+        self.in_use -= 1
+        self.free.append(obj)
+
+    def stats(self):
+        """return hits, misses, objects in use, free objects and the high-water mark"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'high_water': self.high_water,
+        }
@@ -0,0 +1,120 @@
+import json
+from collections import deque
+from time import perf_counter
+
+from hud_text import GlyphText
+from asset_cache import assets
+
+
+class FrameProfiler:
+    """records how long each phase of recent frames took
+
+    the game's phase methods are wrapped on the instance when profiling is
+    turned on, so a game without a profiler runs its methods untouched
+    """
+
+    # methods of AlienInvation timed as phases
+    phases = ('_check_events', '_update_bullets', '_check_bullet_alien_collision',
+              '_update_aliens', '_update_screen')
+
+    def __init__(self, ai_game, capacity=600):
+        """initialize the ring buffer and instrument the game"""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        # each frame is (start, duration, [(phase, start, duration)], pixels pushed)
+        self.frames = deque(maxlen=capacity)
+        self.frame_start = perf_counter()
+        self.current = []
+
+        # overlay drawn under the lives, refreshed a few times per second
+        self.font = assets.font(None, 24)
+        self.text = GlyphText(self.font, (30, 30, 30), self.settings.bg_color)
+        self.overlay_image = self.text.render("profiling")
+        self.overlay_rect = self.overlay_image.get_rect()
+        self.overlay_rect.left = 10
+        self.overlay_rect.top = 70
+
+        self._instrument()
+
+    def _timed(self, name, func):
+        """return func wrapped to record a phase each time it runs"""
+        current = self.current
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current.append((name, start, perf_counter() - start))
+        return timed
+
+    def _instrument(self):
+        """wrap the game's phases, the ship update and the display push"""
+        ai_game = self.ai_game
+        for name in self.phases:
+            setattr(ai_game, name, self._timed(name, getattr(ai_game, name)))
+        ai_game.ship.update = self._timed('ship.update', ai_game.ship.update)
+        ai_game.renderer._present = self._timed('display.flip', ai_game.renderer._present)
+
+        # a frame ends once its screen update is done
+        update_screen = ai_game._update_screen
+
+        def update_screen_and_end_frame(*args, **kwargs):
+            update_screen(*args, **kwargs)
+            self.end_frame()
+        ai_game._update_screen = update_screen_and_end_frame
+
+    def end_frame(self):
+        """close the current frame and start the next one"""
+        now = perf_counter()
+        self.frames.append((self.frame_start, now - self.frame_start, self.current[:],
+                            self.ai_game.renderer.pixels_pushed))
+        self.current.clear()
+        self.frame_start = now
+        if len(self.frames) % 15 == 0:
+            self.prep_overlay()
+
+    def frame_times(self):
+        """return the sorted frame durations in the buffer, in seconds"""
+        return sorted(frame[1] for frame in self.frames)
+
+    def fps(self):
+        """return frames per second over the buffer"""
+        if len(self.frames) < 2:
+            return 0.0
+        first, last = self.frames[0], self.frames[-1]
+        span = last[0] + last[1] - first[0]
+        return len(self.frames) / span if span > 0 else 0.0
+
+    def percentile(self, fraction):
+        """return a frame time percentile in seconds, e.g. fraction 0.99"""
+        times = self.frame_times()
+        if not times:
+            return 0.0
+        return times[min(len(times) - 1, int(fraction * len(times)))]
+
+    def prep_overlay(self):
+        """turn the current figures into the overlay image"""
+        ai_game = self.ai_game
+        overlay_str = (f"FPS {self.fps():.0f}  p50 {self.percentile(0.5) * 1000:.1f}ms  "
+                       f"p99 {self.percentile(0.99) * 1000:.1f}ms  "
+                       f"aliens {len(ai_game.aliens)}  bullets {len(ai_game.bullets)}  "
+                       f"pixels {ai_game.renderer.pixels_pushed / 1000:.0f}k")
+        self.overlay_image = self.text.render(overlay_str)
+        self.overlay_rect = self.overlay_image.get_rect(topleft=self.overlay_rect.topleft)
+
+    def export_chrome_trace(self, path):
+        """write the buffered frames as Chrome trace JSON (chrome://tracing, Perfetto)"""
+        events = []
+        for start, duration, phases, pixels in self.frames:
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': start * 1e6, 'dur': duration * 1e6})
+            events.append({'name': 'pixels pushed', 'ph': 'C', 'pid': 1,
+                           'ts': start * 1e6, 'args': {'pixels': pixels}})
+            for name, phase_start, phase_duration in phases:
+                events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': phase_start * 1e6, 'dur': phase_duration * 1e6})
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
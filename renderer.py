@@ -0,0 +1,166 @@
+import pygame
+
+
+def merge_rects(rects):
+    """union rects that overlap until none do, so no pixel is pushed twice"""
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Renderer:
+    """draws each frame, either in full or by pushing only the regions that changed"""
+
+    def __init__(self, ai_game):
+        """initialize the renderer, the first frame is always drawn in full"""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.screen_rect = self.screen.get_rect()
+
+        # headless games draw off-screen and never push to a display
+        self.present = not ai_game.headless
+        self.needs_full = True
+
+        # what was on screen last frame: sprite rects and hud items by key
+        self.previous_rects = []
+        self.previous_hud = {}
+        # pixels the sprites covered last frame, once overlaps are merged
+        self.previous_area = 0
+
+        # pixels sent to the display by the last frame
+        self.pixels_pushed = 0
+
+    def draw(self, alpha=1.0):
+        """draw the current frame, alpha of the way from the last tick to the next
+
+        once the sprites cover more than settings.dirty_area_limit of the
+        screen, one fill and flip is cheaper than erasing and pushing rects
+        """
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        if (self.settings.dirty_rendering and not self.needs_full
+                and self.previous_area <= self.settings.dirty_area_limit * screen_area):
+            self._draw_dirty(alpha)
+        else:
+            self._draw_full(alpha)
+
+    def _hud_items(self):
+        """return {key: (image, rect, draw)} for the score, lives and play button"""
+        sb = self.ai_game.sb
+        items = {
+            'score': (sb.score_image, sb.score_rect, None),
+            'high_score': (sb.high_score_image, sb.high_score_rect, None),
+            'level': (sb.level_image, sb.level_rect, None),
+        }
+        for number, ship in enumerate(sb.ships.sprites()):
+            items[('ship', number)] = (ship.image, ship.rect.copy(), None)
+        profiler = self.ai_game.profiler
+        if profiler:
+            items['profiler'] = (profiler.overlay_image, profiler.overlay_rect, None)
+        if not self.ai_game.game_active:
+            button = self.ai_game.play_button
+            items['button'] = (button.msg_image, button.rect.copy(), button.draw_button)
+        return items
+
+    def _draw_sprites(self, alpha):
+        """draw bullets, the ship and the fleet at interpolated positions
+
+        returns the rects drawn, the fleet moves as one block so it is
+        given as a single rect around every alien
+        """
+        ai_game = self.ai_game
+        screen = self.screen
+        rects = []
+        for bullet in ai_game.bullets.sprites():
+            rect = bullet.interpolated_rect(alpha)
+            pygame.draw.rect(screen, bullet.color, rect)
+            rects.append(rect)
+
+        rect = ai_game.ship.interpolated_rect(alpha)
+        screen.blit(ai_game.ship.image, rect)
+        rects.append(rect)
+
+        if self.settings.array_fleet:
+            fleet = ai_game.aliens.draw(screen, alpha)
+        else:
+            fleet = screen.blits([(alien.image, alien.interpolated_rect(alpha))
+                                  for alien in ai_game.aliens.sprites()])
+        if fleet:
+            rects.append(fleet[0].unionall(fleet[1:]))
+        return rects
+
+    def _draw_hud_item(self, image, rect, draw):
+        """draw one hud item"""
+        if draw is None:
+            self.screen.blit(image, rect)
+        else:
+            draw()
+
+    def _draw_full(self, alpha):
+        """fill the whole screen, redraw everything and flip"""
+        self.screen.fill(self.settings.bg_color)
+        sprite_rects = self._draw_sprites(alpha)
+        hud = self._hud_items()
+        for image, rect, draw in hud.values():
+            self._draw_hud_item(image, rect, draw)
+
+        self.previous_rects = sprite_rects
+        self.previous_hud = hud
+        self.previous_area = self._area(sprite_rects)
+        self.needs_full = False
+        self.pixels_pushed = self.screen_rect.width * self.screen_rect.height
+        self._present()
+
+    def _draw_dirty(self, alpha):
+        """erase last frame's sprites and changed hud items, redraw and push those rects
+
+        overlapping rects, such as a sprite's old and new place, are merged
+        first so each pixel is erased and pushed once
+        """
+        hud = self._hud_items()
+        erased = list(self.previous_rects)
+        changed = []
+        for key, (image, rect, draw) in self.previous_hud.items():
+            current = hud.get(key)
+            if current is None or current[0] is not image or current[1] != rect:
+                erased.append(rect)
+        for key, item in hud.items():
+            previous = self.previous_hud.get(key)
+            if previous is None or previous[0] is not item[0] or previous[1] != item[1]:
+                changed.append(item[1])
+
+        bg_color = self.settings.bg_color
+        for rect in merge_rects(erased):
+            self.screen.fill(bg_color, rect)
+        sprite_rects = self._draw_sprites(alpha)
+
+        # the hud sits on top, so redraw any item the sprites or erasing touched
+        dirty = merge_rects([rect.clip(self.screen_rect) for rect in erased + sprite_rects + changed])
+        for image, rect, draw in hud.values():
+            if rect.collidelist(dirty) != -1:
+                self._draw_hud_item(image, rect, draw)
+
+        self.previous_rects = sprite_rects
+        self.previous_hud = hud
+        self.previous_area = self._area(sprite_rects)
+        self.pixels_pushed = sum(rect.width * rect.height for rect in dirty)
+        self._present(dirty)
+
+    def _area(self, rects):
+        """pixels of the screen the rects cover, counting overlaps once"""
+        return sum(rect.width * rect.height for rect in merge_rects([rect.clip(self.screen_rect) for rect in rects]))
+
+    def _present(self, rects=None):
+        """push the given rects, or the whole frame, to the display"""
+        if not self.present:
+            return
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
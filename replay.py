@@ -0,0 +1,84 @@
+"""record a session's input to a compact binary log and replay it headless
+
+replay a log from the repository root with: python replay.py session.rec
+"""
+import struct
+import sys
+from time import perf_counter
+
+import pygame
+
+from settings import Settings
+
+# file header: magic, format version, screen width and height
+HEADER = struct.Struct('<4sBHH')
+MAGIC = b'AIRC'
+VERSION = 1
+
+# one record per handled input: simulation tick, kind and two arguments
+RECORD = struct.Struct('<IBii')
+KEYDOWN, KEYUP, CLICK, END = range(4)
+
+
+class InputRecorder:
+    """writes every handled key press, key release and click with its tick"""
+
+    def __init__(self, ai_game, path):
+        """open the log and write the header"""
+        self.ai_game = ai_game
+        self.log = open(path, 'wb')
+        self.log.write(HEADER.pack(MAGIC, VERSION, ai_game.settings.screen_width,
+                                   ai_game.settings.screen_height))
+
+    def record(self, kind, a=0, b=0):
+        """append one input at the current tick"""
+        self.log.write(RECORD.pack(self.ai_game.ticks, kind, a, b))
+
+    def close(self):
+        """mark the tick the session ended on and close the log"""
+        if not self.log.closed:
+            self.record(END)
+            self.log.close()
+
+
+def replay(path, settings=None):
+    """replay a log headless as fast as possible and return the finished game
+
+    settings must match the ones the session was recorded with, the
+    screen size is taken from the log
+    """
+    # imported here so main can import this module for the recorder
+    from main import AlienInvation
+
+    with open(path, 'rb') as log:
+        data = log.read()
+    magic, version, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} input log")
+
+    settings = settings or Settings()
+    settings.screen_width = width
+    settings.screen_height = height
+    ai_game = AlienInvation(headless=True, settings=settings)
+
+    for tick, kind, a, b in RECORD.iter_unpack(data[HEADER.size:]):
+        while ai_game.ticks < tick:
+            ai_game._tick()
+        if kind == END or (kind == KEYDOWN and a == pygame.K_q):
+            break
+        if kind == KEYDOWN:
+            ai_game._check_keydown_events(pygame.event.Event(pygame.KEYDOWN, key=a))
+        elif kind == KEYUP:
+            ai_game._check_keyup_events(pygame.event.Event(pygame.KEYUP, key=a))
+        elif kind == CLICK:
+            ai_game._check_play_button((a, b))
+    return ai_game
+
+
+if __name__ == '__main__':
+    start = perf_counter()
+    game = replay(sys.argv[1])
+    elapsed = perf_counter() - start
+    stats = game.stats
+    print(f"score {stats.score}, level {stats.level}, ships left {stats.ships_left}")
+    print(f"{game.ticks} ticks in {elapsed:.2f}s ({game.ticks / elapsed:,.0f} ticks/s)")
@@ -1,7 +1,8 @@
-import pygame.font
 from pygame.sprite import Group
 
 from ship import Ship
+from asset_cache import assets
+from hud_text import GlyphText
 
 
 class Scoreboard:
@@ -17,7 +18,14 @@ class Scoreboard:
 
         # font settings for score info
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = assets.font(None, 48)
+        self.text = GlyphText(self.font, self.text_color, self.settings.bg_color)
+
+        # strings currently shown, images are only rebuilt when these change
+        self.score_str = None
+        self.high_score_str = None
+        self.level_str = None
+        self.ships = Group()
 
         # prepare the initial score image
         self.prep_score()
@@ -29,7 +37,10 @@ class Scoreboard:
         """turn the score into rendered image"""
         rounded_score = round(self.stats.score, -1)
         score_str = f"{rounded_score:,}"
-        self.score_image = self.font.render(score_str, True, self.text_color, self.settings.bg_color)
+        if score_str == self.score_str:
+            return
+        self.score_str = score_str
+        self.score_image = self.text.render(score_str)
 
         # display the score at the top right of the screen
         self.score_rect = self.score_image.get_rect()
@@ -40,7 +51,10 @@ class Scoreboard:
         """turn the high score into rendered image"""
         high_score = round(self.stats.high_score, -1)
         high_score_str = f"{high_score:,}"
-        self.high_score_image = self.font.render(high_score_str, True, self.text_color, self.settings.bg_color)
+        if high_score_str == self.high_score_str:
+            return
+        self.high_score_str = high_score_str
+        self.high_score_image = self.text.render(high_score_str)
 
         # center the high score at the top of the screen
         self.high_score_rect = self.high_score_image.get_rect()
@@ -50,7 +64,10 @@ class Scoreboard:
     def prep_level(self):
         """turn the level into rendered image"""
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(level_str, True, self.text_color, self.settings.bg_color)
+        if level_str == self.level_str:
+            return
+        self.level_str = level_str
+        self.level_image = self.text.render(level_str)
 
         # position level below the score
         self.level_rect = self.level_image.get_rect()
@@ -58,9 +75,11 @@ class Scoreboard:
         self.level_rect.top = self.score_rect.bottom + 10
 
     def prep_ships(self):
-        """show how many ships are left"""
-        self.ships = Group()
-        for ship_number in range(self.stats.ships_left):
+        """show how many ships are left, only adding or removing the icons that changed"""
+        ships = self.ships.sprites()
+        for ship in ships[self.stats.ships_left:]:
+            self.ships.remove(ship)
+        for ship_number in range(len(ships), self.stats.ships_left):
             ship = Ship(self.ai_game)
             ship.rect.x = 10 + ship_number * ship.rect.width
             ship.rect.y = 10
@@ -69,7 +88,7 @@ class Scoreboard:
     def check_high_score(self):
         """check to see if there is new high score"""
         if self.stats.score > self.stats.high_score:
-            self.stats.high_score = self.stats.high_score
+            self.stats.high_score = self.stats.score
             self.prep_high_score()
 
     def show_score(self):
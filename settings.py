@@ -6,9 +6,46 @@ class Settings:
         self.screen_width = 1200
         self.screen_height = 800
         self.bg_color = (230, 230, 230)
+        # prebuilt images loaded in one read at startup, see asset_cache.py
+        self.asset_bundle = "images/assets.bundle"
+        # print how long the first frame took to appear
+        self.report_startup = False
+        # simulation ticks per second, movement speeds are in pixels per tick
+        self.ticks_per_second = 60
+        # cap on frames drawn per second, 0 draws as fast as possible and
+        # keeps a core busy spinning between ticks
+        self.max_fps = 120
+        # draw sprites between their last two ticks for smooth motion
+        self.interpolate = True
+
+        # time each phase of a frame, show an overlay and write a trace on exit
+        self.profiling = False
+        self.profile_frames = 600
+        self.profile_trace_path = "frame_trace.json"
+
+        # write every handled input to this file for replay, None records nothing
+        self.record_path = None
+
+        # seconds of play kept for rewinding with backspace, 0 turns rewind off
+        self.rewind_seconds = 0
+        # ticks between rewind snapshots
+        self.rewind_interval = 6
+
+        # push only changed regions to the display, False redraws every frame.
+        # it only pays off once few sprites are left, see benchmarks/engine.py
+        self.dirty_rendering = False
+        # share of the screen the sprites may cover before a frame is drawn in full
+        self.dirty_area_limit = 0.25
+
+        # leaderboard kept across sessions, None keeps high scores in memory only
+        self.high_score_path = "scores/high_scores"
+        self.leaderboard_size = 10
+        self.player_name = "player"
 
         # ship settings
         self.ship_limit = 3
+        # seconds the game pauses after the ship is hit
+        self.ship_hit_pause = 0.5
 
         # Bullet settings
         self.bullet_width = 3
@@ -18,6 +55,15 @@ class Settings:
 
         # alien settings
         self.fleet_drop_speed = 10
+        # keep the fleet in numpy arrays instead of one sprite per alien
+        self.array_fleet = False
+
+        # collision settings, the grid cell should hold about one alien
+        self.spatial_hash = True
+        self.collision_cell_size = 120
+        # smaller fleets are checked pair by pair, the grid only pays off from
+        # about 70 aliens (benchmarks/collisions.py), the default screen has 45
+        self.spatial_hash_min_aliens = 80
 
         # how quickly game speeds
         self.speedup_scale = 1.1
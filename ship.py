@@ -1,23 +1,27 @@
-import pygame
 from pygame.sprite import Sprite
 
+from asset_cache import assets
+
 
 class Ship(Sprite):
     """class to manage ship"""
+    image_path = 'images/ship.bmp'
+
     def __init__(self, ai_game):
         """initiate ship and set its starting position"""
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
         self.screen_rect = ai_game.screen.get_rect()
-        self.image = pygame.image.load('images/ship.bmp')
+        self.image = assets.image(self.image_path)
         self.rect = self.image.get_rect()
 
         # position ship at bottom center of screen
         self.rect.midbottom = self.screen_rect.midbottom
 
-        # stores horizontal position of x
+        # stores horizontal position of x, and where it was before the last tick
         self.x = float(self.rect.x)
+        self.previous_x = self.x
 
         """movement flag"""
         self.moving_right = False
@@ -25,6 +29,7 @@ class Ship(Sprite):
 
     def update(self):
         """update ship's position based on movement flag"""
+        self.previous_x = self.x
         if self.moving_right and self.rect.right < self.screen_rect.right:
             self.x += self.settings.ship_speed
         if self.moving_left and self.rect.left > 0:
@@ -32,6 +37,12 @@ class Ship(Sprite):
 
         self.rect.x = self.x
 
+    def interpolated_rect(self, alpha):
+        """return where to draw the ship, alpha of the way through the next tick"""
+        rect = self.rect.copy()
+        rect.x = self.previous_x + (self.x - self.previous_x) * alpha
+        return rect
+
     def blitme(self):
         self.screen.blit(self.image, self.rect)
 
@@ -39,3 +50,4 @@ class Ship(Sprite):
         """centers the ship on the screen"""
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.previous_x = self.x
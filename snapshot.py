@@ -0,0 +1,134 @@
+"""compact binary snapshots of the whole game state, for save/restore and rewind"""
+import struct
+from collections import deque
+
+import numpy as np
+import pygame
+
+# ticks, pause ticks, game active, ship x, ship rect x, ship moving right and left,
+# ship, bullet and alien speed, fleet direction, alien points,
+# ships left, score, level, high score, bullet count, alien count
+HEADER = struct.Struct('<QI?di??dddbqiqqqII')
+BULLET = np.dtype([('y', '<f8'), ('rect_x', '<i4'), ('rect_y', '<i4')])
+ALIEN = np.dtype([('x', '<f8'), ('rect_x', '<i4'), ('rect_y', '<i4')])
+
+
+def capture(ai_game):
+    """return the game state as bytes"""
+    ship = ai_game.ship
+    settings = ai_game.settings
+    stats = ai_game.stats
+
+    bullets = ai_game.bullets.sprites()
+    bullet_state = np.array([(bullet.y, bullet.rect.x, bullet.rect.y) for bullet in bullets], dtype=BULLET)
+    aliens = ai_game.aliens
+    if settings.array_fleet:
+        alive = aliens.alive
+        alien_state = np.empty(aliens.count, dtype=ALIEN)
+        alien_state['x'] = aliens.x[alive]
+        alien_state['rect_x'] = aliens.rect_x[alive]
+        alien_state['rect_y'] = aliens.rect_y[alive]
+    else:
+        alien_state = np.array([(alien.x, alien.rect.x, alien.rect.y) for alien in aliens.sprites()],
+                               dtype=ALIEN)
+
+    header = HEADER.pack(
+        ai_game.ticks, ai_game.pause_ticks, ai_game.game_active,
+        ship.x, ship.rect.x, ship.moving_right, ship.moving_left,
+        settings.ship_speed, settings.bullet_speed, settings.alien_speed,
+        settings.fleet_direction, settings.alien_points,
+        stats.ships_left, stats.score, stats.level, stats.high_score,
+        len(bullet_state), len(alien_state))
+    return header + bullet_state.tobytes() + alien_state.tobytes()
+
+
+def restore(ai_game, data):
+    """put the game back in a captured state, without rebuilding the fleet or loading images"""
+    (ticks, pause_ticks, game_active,
+     ship_x, ship_rect_x, moving_right, moving_left,
+     ship_speed, bullet_speed, alien_speed, fleet_direction, alien_points,
+     ships_left, score, level, high_score,
+     bullet_count, alien_count) = HEADER.unpack_from(data)
+    offset = HEADER.size
+    bullet_state = np.frombuffer(data, dtype=BULLET, count=bullet_count, offset=offset)
+    offset += bullet_state.nbytes
+    alien_state = np.frombuffer(data, dtype=ALIEN, count=alien_count, offset=offset)
+
+    ai_game.ticks = ticks
+    ai_game.pause_ticks = pause_ticks
+    ai_game.game_active = game_active
+
+    settings = ai_game.settings
+    settings.ship_speed = ship_speed
+    settings.bullet_speed = bullet_speed
+    settings.alien_speed = alien_speed
+    settings.fleet_direction = fleet_direction
+    settings.alien_points = alien_points
+
+    stats = ai_game.stats
+    stats.ships_left = ships_left
+    stats.score = score
+    stats.level = level
+    stats.high_score = high_score
+
+    ship = ai_game.ship
+    ship.x = ship.previous_x = ship_x
+    ship.rect.x = ship_rect_x
+    ship.moving_right = moving_right
+    ship.moving_left = moving_left
+
+    # recycle sprites from the pools instead of building new ones
+    ai_game._empty_bullets()
+    for y, rect_x, rect_y in bullet_state.tolist():
+        bullet = ai_game.bullet_pool.acquire()
+        bullet.y = bullet.previous_y = y
+        bullet.rect.x = rect_x
+        bullet.rect.y = rect_y
+        ai_game.bullets.add(bullet)
+
+    ai_game._empty_aliens()
+    if settings.array_fleet:
+        ai_game.aliens.load(alien_state['x'], alien_state['rect_x'], alien_state['rect_y'])
+    else:
+        for x, rect_x, rect_y in alien_state.tolist():
+            alien = ai_game.alien_pool.acquire()
+            alien.x = alien.previous_x = x
+            alien.rect.x = rect_x
+            alien.rect.y = rect_y
+            ai_game.aliens.add(alien)
+        if settings.spatial_hash:
+            ai_game.alien_grid.rebuild(ai_game.aliens)
+
+    ai_game.sb.prep_score()
+    ai_game.sb.prep_high_score()
+    ai_game.sb.prep_level()
+    ai_game.sb.prep_ships()
+    ai_game.renderer.needs_full = True
+    if not ai_game.headless:
+        pygame.mouse.set_visible(not game_active)
+
+
+class SnapshotRing:
+    """the most recent snapshots, oldest dropped first, for rewinding"""
+
+    def __init__(self, capacity):
+        self.snapshots = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def push(self, ai_game):
+        """capture the game and keep the snapshot"""
+        self.snapshots.append(capture(ai_game))
+
+    def rewind(self, ai_game, steps=1):
+        """restore the snapshot taken steps pushes ago, or the oldest one kept
+
+        the restored snapshot and any newer ones are dropped
+        """
+        if not self.snapshots:
+            return False
+        for _ in range(min(steps, len(self.snapshots)) - 1):
+            self.snapshots.pop()
+        restore(ai_game, self.snapshots.pop())
+        return True
@@ -0,0 +1,93 @@
+class SpatialHash:
+    """uniform grid broad phase that buckets sprites by the cells their rect covers
+
+    the fleet moves as one block, so sprites are bucketed once where they
+    were built and queries are shifted by how far the block has moved since
+    """
+
+    def __init__(self, cell_size, slack=2):
+        """initialize an empty grid with square cells of cell_size pixels
+
+        slack widens queries to cover aliens whose float position rounds
+        a pixel away from the rest of the fleet
+        """
+        self.cell_size = cell_size
+        self.slack = slack
+        self.cells = {}
+        # cells each sprite was bucketed in, where it was and its group position
+        self.sprite_cells = {}
+        self.origins = {}
+        self.order = {}
+
+    def _cells_for(self, rect):
+        """return the grid cells a rect covers"""
+        size = self.cell_size
+        left, top = rect.left // size, rect.top // size
+        right = max(rect.right - 1, rect.left) // size
+        bottom = max(rect.bottom - 1, rect.top) // size
+        return [(cx, cy) for cx in range(left, right + 1) for cy in range(top, bottom + 1)]
+
+    def rebuild(self, group):
+        """re-bucket every sprite of the group at its current position"""
+        self.cells = {}
+        self.sprite_cells = {}
+        self.origins = {}
+        self.order = {}
+        for index, sprite in enumerate(group):
+            self.insert(sprite, index)
+
+    def insert(self, sprite, index):
+        """add a single sprite, index keeps results in group order"""
+        cells = self._cells_for(sprite.rect)
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(sprite)
+        self.sprite_cells[sprite] = cells
+        self.origins[sprite] = sprite.rect.topleft
+        self.order[sprite] = index
+
+    def remove(self, sprite):
+        """take a sprite out of the grid"""
+        for cell in self.sprite_cells.pop(sprite, ()):
+            self.cells[cell].remove(sprite)
+        self.origins.pop(sprite, None)
+        self.order.pop(sprite, None)
+
+    def offset(self):
+        """return how far the fleet has moved since it was bucketed"""
+        for sprite, (x, y) in self.origins.items():
+            return sprite.rect.x - x, sprite.rect.y - y
+        return 0, 0
+
+    def query(self, rect):
+        """return sprites whose rect overlaps rect, in group order"""
+        if not self.origins:
+            return []
+        dx, dy = self.offset()
+        search = rect.move(-dx, -dy).inflate(2 * self.slack, 2 * self.slack)
+        found = {}
+        for cell in self._cells_for(search):
+            for sprite in self.cells.get(cell, ()):
+                found[sprite] = None
+        hits = [sprite for sprite in found if rect.colliderect(sprite.rect)]
+        hits.sort(key=self.order.__getitem__)
+        return hits
+
+    def collideany(self, sprite):
+        """return any sprite in the grid colliding with sprite, or None"""
+        hits = self.query(sprite.rect)
+        return hits[0] if hits else None
+
+    def groupcollide(self, group, dokill, dokill_grid):
+        """same result as pygame.sprite.groupcollide against the rebuilt group"""
+        crashed = {}
+        for sprite in group.sprites():
+            collision = self.query(sprite.rect)
+            if collision:
+                crashed[sprite] = collision
+                if dokill_grid:
+                    for hit in collision:
+                        self.remove(hit)
+                        hit.kill()
+                if dokill:
+                    sprite.kill()
+        return crashed
@@ -0,0 +1,19 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the modules under test sit in the repository root
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def game_dir(tmp_path, monkeypatch):
+    """a working directory holding the game's images/ folder, as main.py expects"""
+    (tmp_path / 'images').mkdir()
+    for name in ('alien.bmp', 'ship.bmp'):
+        shutil.copy(os.path.join(ROOT, name), tmp_path / 'images' / name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
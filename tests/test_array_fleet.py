@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from array_fleet import ArrayFleet, to_pixels
+from main import AlienInvation
+from settings import Settings
+
+
+def assigned(value):
+    """what a pygame Rect keeps when a float is assigned to its x"""
+    rect = pygame.Rect(0, 0, 1, 1)
+    rect.x = value
+    return rect.x
+
+
+def test_to_pixels_rounds_like_rect_assignment():
+    rng = np.random.default_rng(0)
+    halves = np.arange(-20, 20) + 0.5
+    values = np.concatenate([halves, np.nextafter(halves, 0), np.nextafter(halves, 1),
+                             rng.uniform(-2000, 2000, 2000), np.arange(-5, 6, 0.25)])
+    np.testing.assert_array_equal(to_pixels(values), [assigned(value) for value in values.tolist()])
+
+
+@pytest.mark.parametrize('bullet_count', [3, 30, 300])
+@pytest.mark.parametrize('dokill', [False, True])
+def test_groupcollide_matches_pygame(game_dir, bullet_count, dokill):
+    settings = Settings()
+    settings.screen_width, settings.screen_height = 1920, 1080
+    game = AlienInvation(headless=True, settings=settings)
+    fleet = ArrayFleet(game)
+    rng = random.Random(bullet_count)
+    for _ in range(20):
+        fleet.create_fleet()
+        fleet.alive[np.array([rng.random() < 0.3 for _ in range(fleet.alive.size)])] = False
+        fleet.count = int(fleet.alive.sum())
+
+        aliens = pygame.sprite.Group()
+        sprite_of = {}
+        for index in np.flatnonzero(fleet.alive).tolist():
+            alien = pygame.sprite.Sprite()
+            alien.rect = pygame.Rect(int(fleet.rect_x[index]), int(fleet.rect_y[index]), fleet.width, fleet.height)
+            aliens.add(alien)
+            sprite_of[index] = alien
+        # the same bullets twice, killing one copy must not touch the other
+        bullets = pygame.sprite.Group()
+        array_bullets = pygame.sprite.Group()
+        twin = {}
+        for _ in range(bullet_count):
+            # tall bullets can cross several aliens, and several bullets one alien
+            rect = pygame.Rect(rng.randrange(1920), rng.randrange(800), 3, rng.choice([15, 200]))
+            bullet, array_bullet = pygame.sprite.Sprite(), pygame.sprite.Sprite()
+            bullet.rect, array_bullet.rect = rect, rect.copy()
+            bullets.add(bullet)
+            array_bullets.add(array_bullet)
+            twin[array_bullet] = bullet
+
+        expected = pygame.sprite.groupcollide(bullets, aliens, dokill, dokill)
+        actual = fleet.groupcollide(array_bullets, dokill, dokill)
+        assert [twin[bullet] for bullet in actual] == list(expected)
+        for bullet, hits in actual.items():
+            assert [sprite_of[index] for index in hits.tolist()] == expected[twin[bullet]]
+        assert {twin[bullet] for bullet in array_bullets} == set(bullets)
+        if dokill:
+            assert fleet.count == len(aliens)
+            assert {sprite_of[index] for index in np.flatnonzero(fleet.alive).tolist()} == set(aliens)
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch_sim import BatchedGames, FIRE, LEFT, PLAY, RIGHT
+from main import AlienInvation
+from settings import Settings
+
+BITS = {'left': LEFT, 'right': RIGHT, 'fire': FIRE, 'play': PLAY}
+
+
+def game_state(game):
+    """what BatchedGames tracks of one AlienInvation"""
+    return (game.ship.rect.x, game.stats.score, game.stats.level, game.stats.ships_left, game.game_active,
+            sorted((bullet.rect.x, bullet.rect.y) for bullet in game.bullets),
+            sorted((alien.rect.x, alien.rect.y) for alien in game.aliens))
+
+
+def batch_state(games, row):
+    bullets = games.bullet_alive[row]
+    aliens = games.alien_alive[row]
+    return (int(games.ship_rect_x[row]), int(games.score[row]), int(games.level[row]),
+            int(games.ships_left[row]), bool(games.game_active[row]),
+            sorted(zip(games.bullet_rect_x[row][bullets].tolist(), games.bullet_rect_y[row][bullets].tolist())),
+            sorted(zip(games.alien_rect_x[row][aliens].tolist(), games.alien_rect_y[row][aliens].tolist())))
+
+
+def make_settings(width, height, fleet_drop_speed, array_fleet):
+    settings = Settings()
+    settings.screen_width = width
+    settings.screen_height = height
+    settings.fleet_drop_speed = fleet_drop_speed
+    settings.bullets_allowed = 6
+    settings.array_fleet = array_fleet
+    return settings
+
+
+# a small fleet that random play clears level after level, and a fast
+# dropping one that hits the ship until the game is over
+SCREENS = {'levels': (400, 420, 10), 'ship hits': (600, 500, 25)}
+
+
+@pytest.mark.parametrize('screen', SCREENS)
+@pytest.mark.parametrize('array_fleet', [False, True])
+def test_batched_games_match_the_engine(game_dir, screen, array_fleet):
+    n_games = 4
+    # each game needs its own settings, speeds and fleet direction change as it plays
+    games = [AlienInvation(headless=True, settings=make_settings(*SCREENS[screen], array_fleet))
+             for _ in range(n_games)]
+    batch = BatchedGames(n_games, make_settings(*SCREENS[screen], False))
+
+    rng = random.Random(0)
+    for tick in range(4000):
+        actions = [{rng.choice(['left', 'right', 'fire', 'fire', 'play'])} for _ in range(n_games)]
+        for game, game_actions in zip(games, actions):
+            game.step(game_actions)
+        batch.step(np.array([sum(BITS[action] for action in game_actions) for game_actions in actions],
+                            dtype=np.uint8))
+        for row, game in enumerate(games):
+            assert batch_state(batch, row) == game_state(game), f"game {row} differs at tick {tick}"
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats.mstats import winsorize
+
+from claims_forecast import build_triangle, forecast, winsorized_mean
+from claims_ingest import compact
+from claims_synthetic import generate
+
+
+def reference_forecast(df):
+    """the per-country loop Test.py ran before it was vectorized, with scipy's winsorize"""
+    df = df.copy()
+    df['Departure_Month'] = pd.to_datetime(df['Departure_Month']).dt.to_period('M')
+    df['Claim_Month'] = pd.to_datetime(df['Claim_Month']).dt.to_period('M')
+    df['Lag'] = (df['Claim_Month'] - df['Departure_Month']).apply(lambda x: x.n)
+    df = df[df['Lag'].isin([0, 1, 2])]
+
+    triangle = df.groupby(['Country', 'Departure_Month', 'Lag'])['Claim_Amount'].sum().unstack(fill_value=0)
+    for lag in [0, 1, 2]:
+        if lag not in triangle.columns:
+            triangle[lag] = 0
+    triangle = triangle[[0, 1, 2]]
+    triangle['Total'] = triangle.sum(axis=1)
+    triangle = triangle[triangle['Total'] > 0]
+    ratio_triangle = triangle[[0, 1, 2]].div(triangle['Total'], axis=0)
+
+    def mean(series, lower=0.05, upper=0.05):
+        return np.mean(winsorize(series, limits=[lower, upper]))
+
+    results = []
+    for country in ratio_triangle.index.get_level_values(0).unique():
+        country_ratio = ratio_triangle.loc[country].sort_index()
+        country_triangle = triangle.loc[country].sort_index()
+        latest_month = country_ratio.index.max()
+        history_ratio = country_ratio.loc[country_ratio.index < latest_month].tail(12)
+        if len(history_ratio) < 4:
+            continue
+        ratios = [mean(history_ratio[lag]) for lag in range(3)]
+        total_ratio = sum(ratios)
+        ratios = [ratio / total_ratio for ratio in ratios]
+        lag0_actual = country_triangle.loc[latest_month][0]
+        estimated_total = lag0_actual / ratios[0] if ratios[0] > 0 else lag0_actual
+        results.append([country, latest_month, lag0_actual, estimated_total,
+                        estimated_total * ratios[1], estimated_total * ratios[2]] + ratios)
+    return pd.DataFrame(results, columns=[
+        "Country", "Departure_Month", "Current_Lag0_Actual", "Estimated_Final_Total",
+        "Forecast_Lag1_NextMonth", "Forecast_Lag2_MonthPlus2",
+        "Lag0_Ratio_Used", "Lag1_Ratio_Used", "Lag2_Ratio_Used"])
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_forecast_matches_the_reference_loop(seed):
+    # late starting countries give short histories, some below min_history
+    raw = pd.concat(generate(30_000, countries=120, late_share=0.3, seed=seed), ignore_index=True)
+    expected = reference_forecast(raw)
+    actual = forecast(build_triangle(compact(raw, amount_dtype=np.float64)))
+
+    assert len(expected) < raw['Country'].nunique()
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True, check_dtype=False)
+
+
+@pytest.mark.parametrize('limits', [(0.05, 0.05), (0.0, 0.1), (0.2, 0.0), (0.1, 0.3)])
+def test_winsorized_mean_matches_scipy(limits):
+    rng = np.random.default_rng(0)
+    for n in range(1, 15):
+        # rounding makes ties, which winsorize must clip the same way
+        values = rng.normal(size=(20, n)).round(1)
+        expected = [np.mean(winsorize(row, limits=list(limits))) for row in values]
+        np.testing.assert_array_equal(winsorized_mean(values, *limits), expected)
+
+
+def test_build_triangle_sums_float32_amounts_in_float64():
+    raw = pd.DataFrame({'Country': ['UK'] * 3, 'Departure_Month': ['2024-01'] * 3,
+                        'Claim_Month': ['2024-01'] * 3, 'Claim_Amount': [0.1, 1e7, 0.37]})
+    triangle = build_triangle(compact(raw))
+    assert triangle.dtype == np.float64
+    assert triangle.iloc[0] == pytest.approx(10_000_000.47, abs=1e-6)
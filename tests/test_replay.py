@@ -0,0 +1,45 @@
+import random
+
+import pygame
+
+import replay
+from main import AlienInvation
+from settings import Settings
+
+
+def state(game):
+    """the state a replayed session must end in"""
+    return (game.ticks, game.pause_ticks, game.game_active, game.ship.x, game.ship.rect.x,
+            game.stats.score, game.stats.level, game.stats.ships_left, game.settings.alien_speed,
+            game.settings.fleet_direction,
+            sorted((bullet.y, bullet.rect.x, bullet.rect.y) for bullet in game.bullets),
+            sorted((alien.rect.x, alien.rect.y) for alien in game.aliens))
+
+
+def test_recorded_session_replays_to_the_same_state(game_dir):
+    settings = Settings()
+    settings.record_path = str(game_dir / 'session.rec')
+    settings.fleet_drop_speed = 25
+    game = AlienInvation(headless=True, settings=settings)
+    game._check_play_button(game.play_button.rect.center)
+
+    keys = [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE]
+    rng = random.Random(2)
+    held = set()
+    for _ in range(3000):
+        key = rng.choice(keys)
+        if key in held:
+            held.discard(key)
+            game._check_keyup_events(pygame.event.Event(pygame.KEYUP, key=key))
+        else:
+            held.add(key)
+            game._check_keydown_events(pygame.event.Event(pygame.KEYDOWN, key=key))
+        for _ in range(rng.randrange(3)):
+            game._tick()
+    game.recorder.close()
+    assert game.stats.score > 0
+
+    replayed_settings = Settings()
+    replayed_settings.fleet_drop_speed = 25
+    replayed = replay.replay(settings.record_path, replayed_settings)
+    assert state(replayed) == state(game)
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+import snapshot
+from main import AlienInvation
+from settings import Settings
+
+ACTIONS = ['left', 'right', 'fire', 'fire']
+
+
+def make_game(array_fleet=False):
+    settings = Settings()
+    settings.array_fleet = array_fleet
+    settings.fleet_drop_speed = 25
+    game = AlienInvation(headless=True, settings=settings)
+    game.step({'play'})
+    return game
+
+
+def state(game):
+    """everything a snapshot holds, as plain values"""
+    return (game.ticks, game.pause_ticks, game.game_active, game.ship.x, game.ship.rect.x,
+            game.stats.score, game.stats.level, game.stats.ships_left, game.settings.alien_speed,
+            game.settings.fleet_direction,
+            sorted((bullet.y, bullet.rect.x, bullet.rect.y) for bullet in game.bullets),
+            sorted((alien.rect.x, alien.rect.y) for alien in game.aliens))
+
+
+@pytest.mark.parametrize('array_fleet', [False, True])
+def test_restored_snapshot_plays_on_identically(game_dir, array_fleet):
+    game = make_game(array_fleet)
+    rng = random.Random(0)
+    for _ in range(500):
+        game.step({rng.choice(ACTIONS)})
+
+    data = snapshot.capture(game)
+    actions = [{rng.choice(ACTIONS)} for _ in range(1500)]
+    states = []
+    for game_actions in actions:
+        game.step(game_actions)
+        states.append(state(game))
+    assert game.stats.ships_left < game.settings.ship_limit
+
+    snapshot.restore(game, data)
+    assert snapshot.capture(game) == data
+    for expected, game_actions in zip(states, actions):
+        game.step(game_actions)
+        assert state(game) == expected
+
+
+def test_rewind_restores_an_earlier_tick(game_dir):
+    game = make_game()
+    ring = snapshot.SnapshotRing(4)
+    rng = random.Random(1)
+    pushed = []
+    for tick in range(1, 301):
+        game.step({rng.choice(ACTIONS)})
+        if tick % 50 == 0:
+            ring.push(game)
+            pushed.append(snapshot.capture(game))
+    kept = snapshot.capture(game)
+
+    # only the last 4 of 6 pushes are kept, rewinding 2 goes back to the fifth
+    assert len(ring) == 4
+    assert ring.rewind(game, 2)
+    assert snapshot.capture(game) == pushed[4]
+    assert len(ring) == 2
+    assert snapshot.capture(game) != kept
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from claims_synthetic import write
+from triangle_store import TriangleStore
+
+
+@pytest.fixture
+def claims_files(tmp_path, monkeypatch):
+    """a full history and two monthly batches as csv, with the parquet cache in tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    paths = {}
+    for name, rows, seed in [('history', 20_000, 0), ('batch1', 1_000, 1), ('batch2', 1_000, 2)]:
+        paths[name] = str(tmp_path / f"{name}.csv")
+        write(paths[name], rows, countries=50, seed=seed)
+    return paths
+
+
+def full_rebuild(tmp_path, paths, horizon):
+    """a store rebuilt from every file concatenated into one history"""
+    combined = str(tmp_path / 'combined.csv')
+    pd.concat([pd.read_csv(path) for path in paths]).to_csv(combined, index=False)
+    store = TriangleStore(str(tmp_path / 'reference'), horizon=horizon)
+    store.rebuild(combined)
+    return store
+
+
+def assert_same_store(store, reference):
+    pd.testing.assert_series_equal(store.triangle.sort_index(), reference.triangle.sort_index(), rtol=1e-5)
+    pd.testing.assert_frame_equal(store.forecast_df, reference.forecast_df, rtol=1e-5)
+
+
+def test_horizon_change_rebuilds_then_ingests(tmp_path, claims_files):
+    path = str(tmp_path / 'store')
+    store = TriangleStore(path, horizon=3)
+    store.rebuild(claims_files['history'])
+    store.ingest(claims_files['batch1'])
+
+    store = TriangleStore(path, horizon=4)
+    assert store.triangle is not None
+    assert store.triangle.index.get_level_values(2).max() == 3
+    store.ingest(claims_files['batch2'])
+
+    reference = full_rebuild(tmp_path, [claims_files[name] for name in ('history', 'batch1', 'batch2')], 4)
+    assert_same_store(store, reference)
+    assert_same_store(TriangleStore(path, horizon=4), reference)
+
+
+def test_horizon_change_without_sources_refuses_batches(tmp_path, claims_files):
+    path = str(tmp_path / 'store')
+    store = TriangleStore(path, horizon=3)
+    store.rebuild(claims_files['history'])
+    (tmp_path / 'history.csv').unlink()
+
+    store = TriangleStore(path, horizon=4)
+    assert store.triangle is None
+    with pytest.raises(ValueError, match="rebuild"):
+        store.ingest(claims_files['batch1'])
+
+
+def test_ingest_matches_a_full_rebuild(tmp_path, claims_files):
+    path = str(tmp_path / 'store')
+    store = TriangleStore(path)
+    store.rebuild(claims_files['history'])
+    affected = store.ingest(claims_files['batch1'])
+    assert affected
+    store.ingest(claims_files['batch2'])
+
+    reference = full_rebuild(tmp_path, [claims_files[name] for name in ('history', 'batch1', 'batch2')], 3)
+    assert_same_store(store, reference)
+    # and again once reopened from disk
+    assert_same_store(TriangleStore(path), reference)
+
+
+def test_ingest_counts_a_batch_once(tmp_path, claims_files):
+    store = TriangleStore(str(tmp_path / 'store'))
+    store.rebuild(claims_files['history'])
+    store.ingest(claims_files['batch1'])
+    triangle = store.triangle.copy()
+    assert store.ingest(claims_files['batch1']) == set()
+    pd.testing.assert_series_equal(store.triangle, triangle)
+
+
+def test_ingest_refuses_a_store_without_history(tmp_path, claims_files):
+    store = TriangleStore(str(tmp_path / 'store'))
+    with pytest.raises(ValueError, match="rebuild"):
+        store.ingest(claims_files['batch1'])
+    assert store.triangle is None
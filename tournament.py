@@ -0,0 +1,193 @@
+"""run many headless Alien Invasion sessions across all cores
+
+example, from the repository root:
+    python tournament.py --repeats 50 --policy random sweep --bullets-allowed 3 10 --out results.parquet
+
+every combination of the listed settings is played --repeats times, each
+session with its own seed, and results are streamed to --out as sessions
+finish. results are columnar parquet by default, without pyarrow they go
+to a csv of the same name instead, and any other --out is written as csv
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import random
+from time import perf_counter
+
+from settings import Settings
+
+# result columns, in file order
+COLUMNS = ['session', 'seed', 'policy', 'speedup_scale', 'bullets_allowed', 'ship_limit',
+           'screen_width', 'screen_height', 'score', 'level', 'ticks', 'wall_time']
+
+
+def random_policy(rng):
+    """move at random and fire about half the time"""
+    moves = [(), ('left',), ('right',)]
+
+    def policy(game):
+        actions = set(rng.choice(moves))
+        if rng.random() < 0.5:
+            actions.add('fire')
+        return actions
+    return policy
+
+
+def sweep_policy(rng):
+    """chase the lowest alien and keep firing"""
+    def policy(game):
+        aliens = game.aliens.sprites()
+        if not aliens:
+            return {'fire'}
+        target = max(aliens, key=lambda alien: (alien.rect.bottom, -abs(alien.rect.centerx - game.ship.rect.centerx)))
+        # a little noise keeps sessions with different seeds apart
+        offset = target.rect.centerx - game.ship.rect.centerx + rng.randint(-5, 5)
+        if offset > 2:
+            return {'right', 'fire'}
+        if offset < -2:
+            return {'left', 'fire'}
+        return {'fire'}
+    return policy
+
+
+POLICIES = {'random': random_policy, 'sweep': sweep_policy}
+
+
+def run_session(session):
+    """play one headless game to the end, or to max_ticks, and return its results"""
+    # imported in the worker so the parent never initializes pygame
+    from main import AlienInvation
+
+    settings = Settings()
+    for name in ('speedup_scale', 'bullets_allowed', 'ship_limit', 'screen_width', 'screen_height'):
+        setattr(settings, name, session[name])
+    game = AlienInvation(headless=True, settings=settings)
+    policy = POLICIES[session['policy']](random.Random(session['seed']))
+
+    start = perf_counter()
+    game.step({'play'})
+    while game.game_active and game.ticks < session['max_ticks']:
+        game.step(policy(game))
+
+    result = {name: session[name] for name in COLUMNS[:8]}
+    result.update(score=game.stats.score, level=game.stats.level, ticks=game.ticks,
+                  wall_time=perf_counter() - start)
+    return result
+
+
+class CsvResults:
+    """writes one csv row per session as soon as it finishes"""
+
+    def __init__(self, path):
+        self.results_file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.results_file, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, result):
+        self.writer.writerow(result)
+        self.results_file.flush()
+
+    def close(self):
+        self.results_file.close()
+
+
+class ParquetResults:
+    """buffers finished sessions and writes them to parquet one row group at a time"""
+
+    def __init__(self, path, batch_size=64):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ('session', pa.int32()), ('seed', pa.int64()), ('policy', pa.string()),
+            ('speedup_scale', pa.float32()), ('bullets_allowed', pa.int16()), ('ship_limit', pa.int16()),
+            ('screen_width', pa.int16()), ('screen_height', pa.int16()), ('score', pa.int64()),
+            ('level', pa.int32()), ('ticks', pa.int64()), ('wall_time', pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write(self, result):
+        self.rows.append(result)
+        if len(self.rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def open_results(path):
+    """return the results writer for path and the path it really writes to"""
+    if path.endswith('.parquet'):
+        try:
+            return ParquetResults(path), path
+        except ImportError:
+            path = path[:-len('.parquet')] + '.csv'
+            print(f"pyarrow is not installed, writing csv to {path}")
+    return CsvResults(path), path
+
+
+def build_sessions(args):
+    """every combination of the listed settings, repeated, each with its own seed"""
+    combinations = itertools.product(args.policy, args.speedup_scale, args.bullets_allowed,
+                                     args.ship_limit, args.screen_size)
+    sessions = []
+    for combination in combinations:
+        policy, speedup_scale, bullets_allowed, ship_limit, (width, height) = combination
+        for _ in range(args.repeats):
+            number = len(sessions)
+            sessions.append({
+                'session': number, 'seed': args.seed + number, 'policy': policy,
+                'speedup_scale': speedup_scale, 'bullets_allowed': bullets_allowed,
+                'ship_limit': ship_limit, 'screen_width': width, 'screen_height': height,
+                'max_ticks': args.max_ticks,
+            })
+    return sessions
+
+
+def screen_size(value):
+    """parse WIDTHxHEIGHT"""
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    defaults = Settings()
+    parser = argparse.ArgumentParser(description="Run headless Alien Invasion sessions in parallel")
+    parser.add_argument('--policy', nargs='+', choices=sorted(POLICIES), default=['random'])
+    parser.add_argument('--speedup-scale', nargs='+', type=float, default=[defaults.speedup_scale])
+    parser.add_argument('--bullets-allowed', nargs='+', type=int, default=[defaults.bullets_allowed])
+    parser.add_argument('--ship-limit', nargs='+', type=int, default=[defaults.ship_limit])
+    parser.add_argument('--screen-size', nargs='+', type=screen_size,
+                        default=[(defaults.screen_width, defaults.screen_height)], metavar='WxH')
+    parser.add_argument('--repeats', type=int, default=10, help="sessions per combination")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first session")
+    parser.add_argument('--max-ticks', type=int, default=100_000, help="stop sessions that run longer")
+    parser.add_argument('--processes', type=int, default=None, help="defaults to every core")
+    parser.add_argument('--out', default='tournament_results.parquet', help=".parquet, or .csv for csv")
+    args = parser.parse_args()
+
+    sessions = build_sessions(args)
+    results, out = open_results(args.out)
+    start = perf_counter()
+    try:
+        with multiprocessing.Pool(args.processes) as pool:
+            for done, result in enumerate(pool.imap_unordered(run_session, sessions), 1):
+                results.write(result)
+                print(f"\r{done}/{len(sessions)} sessions", end='', flush=True)
+    finally:
+        results.close()
+    print(f"\n{len(sessions)} sessions in {perf_counter() - start:.1f}s, results in {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import glob
+import json
+import os
+
+import pandas as pd
+
+from claims_ingest import checksum, load_claims
+from claims_forecast import HORIZON, build_triangle, forecast, affected_countries
+
+
+class TriangleStore:
+    """development triangle and forecast kept on disk between monthly runs
+
+    new claim batches are summed on their own and added to the stored
+    cells, and only countries whose history window changed are forecast
+    again, so a refresh costs about as much as the batch it adds
+    """
+
+    def __init__(self, path, horizon=HORIZON, window=12, min_history=4, lower=0.05, upper=0.05):
+        """load the stored triangle and forecast, if any
+
+        a triangle stored with another horizon lacks the other lags, so it
+        is built again right away from the history and batches it came from.
+        if any of those files is gone or changed the store is left empty and
+        has to be rebuilt before batches can be added
+        """
+        self.path = path
+        self.parameters = {'horizon': horizon, 'window': window, 'min_history': min_history,
+                           'lower': lower, 'upper': upper}
+
+        # checksum of the file the triangle was built from and of every batch added since
+        self.source = None
+        self.batches = []
+        # and where those files were, to build the triangle again for another horizon
+        self.source_path = None
+        self.batch_paths = []
+        # files of each save carry a new generation, the manifest names the current one
+        self.generation = 0
+        self.triangle = None
+        self.forecast_df = None
+
+        if os.path.exists(self._manifest_path()):
+            with open(self._manifest_path()) as manifest_file:
+                manifest = json.load(manifest_file)
+            self.generation = manifest['generation']
+            if manifest['parameters'].get('horizon') != horizon:
+                self._replay(manifest)
+                return
+            self.source = manifest['source']
+            self.batches = manifest['batches']
+            self.source_path = manifest.get('source_path')
+            self.batch_paths = manifest.get('batch_paths', [])
+            self.triangle = pd.read_parquet(self._data_path('triangle'))['Claim_Amount']
+            if manifest['parameters'] == self.parameters:
+                self.forecast_df = pd.read_parquet(self._data_path('forecast'))
+            else:
+                self.forecast_df = forecast(self.triangle, **self.parameters)
+
+    def _manifest_path(self):
+        return self.path + '.json'
+
+    def _data_path(self, name, generation=None):
+        if generation is None:
+            generation = self.generation
+        return f"{self.path}.{generation}.{name}.parquet"
+
+    def _replay(self, manifest):
+        """build the triangle again from the files a manifest was built from, if all are unchanged"""
+        paths = [manifest.get('source_path')] + manifest.get('batch_paths', [])
+        digests = [manifest['source']] + manifest['batches']
+        if len(paths) != len(digests) or not all(
+                path is not None and os.path.exists(path) and checksum(path) == digest
+                for path, digest in zip(paths, digests)):
+            return
+        self.rebuild(paths[0])
+        for batch_path in paths[1:]:
+            self.ingest(batch_path)
+
+    def _require_triangle(self):
+        """batches only hold new claims, adding one to nothing would lose the history"""
+        if self.triangle is None:
+            raise ValueError(f"{self.path} holds no triangle to add claims to, "
+                             f"run rebuild() with the full claims history first")
+
+    def rebuild(self, source_path):
+        """build the triangle from a full claims history, unless it is already built from it
+
+        batches added since are kept while the history file is unchanged.
+        returns True if anything was recomputed
+        """
+        digest = checksum(source_path)
+        if digest == self.source and self.forecast_df is not None:
+            return False
+        self.triangle = build_triangle(load_claims(source_path), self.parameters['horizon'])
+        self.forecast_df = forecast(self.triangle, **self.parameters)
+        self.source = digest
+        self.batches = []
+        self.source_path = os.path.abspath(source_path)
+        self.batch_paths = []
+        self.save()
+        return True
+
+    def ingest(self, batch_path):
+        """add a batch of new claims once, returning the countries forecast again
+
+        raises ValueError while the store holds no triangle, see apply
+        """
+        self._require_triangle()
+        digest = checksum(batch_path)
+        if digest in self.batches:
+            return set()
+        affected = self.apply(build_triangle(load_claims(batch_path), self.parameters['horizon']))
+        self.batches.append(digest)
+        self.batch_paths.append(os.path.abspath(batch_path))
+        self.save()
+        return affected
+
+    def apply(self, delta):
+        """add a triangle of new claims to the stored cells and refresh the forecast
+
+        returns the countries forecast again. a batch only holds new claims,
+        so the store must already hold the full history
+        """
+        self._require_triangle()
+        self.triangle = self.triangle.add(delta, fill_value=0.0)
+        affected = affected_countries(self.triangle, delta.index, self.parameters['window'])
+
+        refreshed = forecast(self.triangle[self.triangle.index.get_level_values(0).isin(affected)],
+                             **self.parameters)
+        kept = self.forecast_df
+        if kept is not None:
+            kept = kept[~kept['Country'].isin(affected)]
+        self.forecast_df = (pd.concat([kept, refreshed], ignore_index=True)
+                            .sort_values('Country', ignore_index=True))
+        return affected
+
+    def save(self):
+        """write the triangle and forecast as a new generation, then switch the manifest to it
+
+        a crash before the manifest is replaced leaves the previous
+        generation in use, so a batch is never counted twice
+        """
+        generation = self.generation + 1
+        self.triangle.to_frame('Claim_Amount').to_parquet(self._data_path('triangle', generation))
+        self.forecast_df.to_parquet(self._data_path('forecast', generation), index=False)
+        manifest = {'source': self.source, 'batches': self.batches, 'generation': generation,
+                    'source_path': self.source_path, 'batch_paths': self.batch_paths,
+                    'parameters': self.parameters}
+        temporary_path = self._manifest_path() + '.tmp'
+        with open(temporary_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        os.replace(temporary_path, self._manifest_path())
+        self.generation = generation
+
+        for stale_path in glob.glob(glob.escape(self.path) + '.*.*.parquet'):
+            stale_generation = stale_path[len(self.path) + 1:].split('.')[0]
+            if stale_generation.isdigit() and int(stale_generation) != generation:
+                os.remove(stale_path)